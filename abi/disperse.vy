@@ -0,0 +1,40 @@
+# pragma version ~=0.4.0
+"""
+@title Disperse
+@notice Sends BNB or an ERC20 token to many recipients in one transaction.
+        Same external interface as the Disperse contract (disperse.app).
+        Compiled with `vyper --evm-version paris` 0.4.3 into disperse.bin;
+        ABI in disperse.json.
+"""
+
+from ethereum.ercs import IERC20
+
+MAX_RECIPIENTS: constant(uint256) = 1024
+
+
+@external
+@payable
+def disperseEther(
+    recipients: DynArray[address, MAX_RECIPIENTS],
+    values: DynArray[uint256, MAX_RECIPIENTS],
+):
+    assert len(recipients) == len(values), "length mismatch"
+    for i: uint256 in range(len(recipients), bound=MAX_RECIPIENTS):
+        send(recipients[i], values[i])
+    if self.balance > 0:
+        send(msg.sender, self.balance)
+
+
+@external
+def disperseToken(
+    token: IERC20,
+    recipients: DynArray[address, MAX_RECIPIENTS],
+    values: DynArray[uint256, MAX_RECIPIENTS],
+):
+    assert len(recipients) == len(values), "length mismatch"
+    total: uint256 = 0
+    for value: uint256 in values:
+        total += value
+    assert extcall token.transferFrom(msg.sender, self, total), "transferFrom failed"
+    for i: uint256 in range(len(recipients), bound=MAX_RECIPIENTS):
+        assert extcall token.transfer(recipients[i], values[i]), "transfer failed"
@@ -0,0 +1,590 @@
+import argparse
+import importlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import rlp
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_utils import function_signature_to_4byte_selector, keccak
+
+# main.py connects to its RPC endpoints when imported, so it is imported in
+# main_benchmark() once the mock chain is serving and NULINK_RPC_URLS points
+# at it; otherwise every run would first probe the public testnet.
+main = None
+
+CONTRACTS_FILE = "abi/contracts.json"
+
+SIZES = (100, 1000, 10000)
+SCENARIOS = ("balances", "fund", "stake", "claim", "storm", "storm-phased")
+DEFAULT_SCENARIOS = ("balances", "fund", "stake", "claim")
+TOKEN_BALANCE = 20 * 10**18
+PENDING_REWARD = 5 * 10**18
+CHAIN_ID = 97
+GAS_ESTIMATE = 120000
+BASE_FEE = 10**9
+PRIORITY_FEE = 10**9
+
+BALANCE_OF = function_signature_to_4byte_selector("balanceOf(address)")
+ALLOWANCE = function_signature_to_4byte_selector("allowance(address,address)")
+APPROVE = function_signature_to_4byte_selector("approve(address,uint256)")
+TRANSFER = function_signature_to_4byte_selector("transfer(address,uint256)")
+PENDING_USER_REWARD = function_signature_to_4byte_selector("pendingUserReward(address)")
+STAKE = function_signature_to_4byte_selector("stake(address,address,address,uint96)")
+CLAIM_REWARD = function_signature_to_4byte_selector("claimReward(address)")
+AGGREGATE3 = function_signature_to_4byte_selector("aggregate3((address,bool,bytes)[])")
+ERROR_SELECTOR = function_signature_to_4byte_selector("Error(string)")
+REVERT_REASONS = {
+    APPROVE: "approve failed",
+    TRANSFER: "ERC20: transfer amount exceeds balance",
+    STAKE: "ERC20: insufficient allowance",
+    CLAIM_REWARD: "no reward",
+}
+APPROVAL_TOPIC = "0x" + keccak(text="Approval(address,address,uint256)").hex()
+TRANSFER_TOPIC = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+
+
+def topic(address):
+    return "0x" + "00" * 12 + address.lower()[2:]
+
+
+class RpcError(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class MockChain:
+    """In-memory stand-in for the token, stake and Multicall3 contracts."""
+
+    def __init__(self, latency=0.0, block_time=0.0, rate_limit=0):
+        self.latency = latency
+        self.block_time = block_time
+        self.rate_limit = rate_limit
+        self.accepted = deque()
+        with open(CONTRACTS_FILE, "r", encoding="utf-8") as file:
+            addresses = json.load(file)
+        self.token = addresses["nulink_token_address"].lower()
+        self.stake = addresses["stake_contract_address"].lower()
+        self.multicall = addresses["multicall3_address"].lower()
+        self.faucet = addresses["contract_address"].lower()
+        self.lock = threading.Lock()
+        self.native = {}
+        self.tokens = {}
+        self.allowances = {}
+        self.rewards = {}
+        self.nonces = {}
+        self.receipts = {}
+        self.known = set()
+        self.mempool = []
+        self.logs = []
+        self.blocks = {0: []}
+        self.block = 0
+        self.reset_counters()
+        if block_time:
+            threading.Thread(target=self._mine_loop, daemon=True).start()
+
+    def _mine_loop(self):
+        while True:
+            time.sleep(self.block_time)
+            with self.lock:
+                self.mine()
+
+    def mine(self):
+        self.block += 1
+        block_hash = "0x" + keccak(self.block.to_bytes(32, "big")).hex()
+        for index, receipt in enumerate(self.mempool):
+            receipt["blockNumber"] = hex(self.block)
+            receipt["blockHash"] = block_hash
+            receipt["transactionIndex"] = hex(index)
+            for entry in receipt["logs"]:
+                entry.update(
+                    blockNumber=hex(self.block),
+                    blockHash=block_hash,
+                    transactionIndex=hex(index),
+                )
+                self.logs.append(entry)
+            self.receipts[receipt["transactionHash"]] = receipt
+        self.blocks[self.block] = [receipt["transactionHash"] for receipt in self.mempool]
+        self.mempool = []
+
+    def reset_counters(self):
+        self.http_requests = 0
+        self.throttled = 0
+        self.calls = 0
+        self.methods = {}
+
+    def seed(self, addresses, tokens=TOKEN_BALANCE, rewards=PENDING_REWARD):
+        with self.lock:
+            for address in addresses:
+                address = address.lower()
+                self.tokens[address] = tokens
+                self.rewards[address] = rewards
+                self.allowances.pop(address, None)
+
+    def admit(self, calls):
+        # Like a hosted node: past rate_limit calls in the last second the
+        # whole HTTP request is rejected with a 429.
+        if not self.rate_limit:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            while self.accepted and self.accepted[0] < now - 1:
+                self.accepted.popleft()
+            if len(self.accepted) + calls > self.rate_limit:
+                self.throttled += 1
+                return False
+            self.accepted.extend([now] * calls)
+            return True
+
+    def handle(self, request):
+        method = request.get("method")
+        self.calls += 1
+        self.methods[method] = self.methods.get(method, 0) + 1
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            handler = getattr(self, "rpc_" + method, None)
+            if handler is None:
+                raise RpcError(-32601, f"Method {method} not found")
+            with self.lock:
+                response["result"] = handler(*request.get("params", []))
+        except RpcError as e:
+            response["error"] = {"code": e.code, "message": str(e)}
+            if e.data is not None:
+                response["error"]["data"] = e.data
+        except Exception as e:
+            response["error"] = {"code": -32603, "message": f"{type(e).__name__}: {e}"}
+        return response
+
+    def rpc_web3_clientVersion(self):
+        return "benchmark/mock"
+
+    def rpc_net_version(self):
+        return str(CHAIN_ID)
+
+    def rpc_eth_chainId(self):
+        return hex(CHAIN_ID)
+
+    def rpc_eth_blockNumber(self):
+        return hex(self.block)
+
+    def rpc_eth_gasPrice(self):
+        return hex(BASE_FEE + PRIORITY_FEE)
+
+    def rpc_eth_maxPriorityFeePerGas(self):
+        return hex(PRIORITY_FEE)
+
+    def _block_number(self, number):
+        if number in ("latest", "pending", "safe", "finalized"):
+            return self.block
+        return 0 if number == "earliest" else int(number, 16)
+
+    def rpc_eth_getBlockByNumber(self, number, full=False):
+        number = self._block_number(number)
+        if number not in self.blocks:
+            return None
+        return {
+            "number": hex(number),
+            "hash": "0x" + keccak(number.to_bytes(32, "big")).hex(),
+            "parentHash": "0x" + keccak((number - 1).to_bytes(32, "big", signed=True)).hex(),
+            "timestamp": hex(int(time.time())),
+            "gasLimit": hex(30000000),
+            "gasUsed": hex(GAS_ESTIMATE * len(self.blocks[number])),
+            "baseFeePerGas": hex(BASE_FEE),
+            "transactions": self.blocks[number],
+        }
+
+    def rpc_eth_getBlockReceipts(self, number):
+        number = self._block_number(number)
+        if number not in self.blocks:
+            return None
+        return [self.receipts[tx_hash] for tx_hash in self.blocks[number]]
+
+    def rpc_eth_getCode(self, address, block="latest"):
+        return "0x6001" if address.lower() in (self.token, self.stake, self.multicall) else "0x"
+
+    def rpc_eth_getBalance(self, address, block="latest"):
+        return hex(self.native.get(address.lower(), 0))
+
+    def rpc_eth_getTransactionCount(self, address, block="latest"):
+        return hex(self.nonces.get(address.lower(), 0))
+
+    def rpc_eth_estimateGas(self, tx, block=None):
+        return hex(GAS_ESTIMATE)
+
+    def rpc_eth_call(self, tx, block="latest"):
+        data = bytes.fromhex(tx.get("data", tx.get("input", "0x"))[2:])
+        to = tx["to"].lower()
+        if tx.get("from") and (data[:4] in REVERT_REASONS or to == self.faucet):
+            return self.simulate(tx["from"].lower(), to, int(tx.get("value", "0x0"), 16), data)
+        return "0x" + self.call(to, data).hex()
+
+    def simulate(self, sender, to, value, data):
+        saved = [dict(state) for state in (self.native, self.tokens, self.allowances, self.rewards)]
+        try:
+            status = self.execute(sender, to, value, data, [])
+        finally:
+            self.native, self.tokens, self.allowances, self.rewards = saved
+        if not status:
+            reason = REVERT_REASONS.get(data[:4], "insufficient funds")
+            raise RpcError(
+                3,
+                f"execution reverted: {reason}",
+                "0x" + (ERROR_SELECTOR + encode(["string"], [reason])).hex(),
+            )
+        return "0x"
+
+    def rpc_eth_sendRawTransaction(self, raw_tx):
+        raw = bytes.fromhex(raw_tx[2:])
+        tx_hash = "0x" + keccak(raw).hex()
+        if tx_hash in self.known:
+            raise RpcError(-32000, "already known")
+        sender = Account.recover_transaction(raw).lower()
+        if raw[0] == 2:
+            fields = rlp.decode(raw[1:])
+            nonce, to, value, data = fields[1], fields[5], fields[6], fields[7]
+        else:
+            fields = rlp.decode(raw)
+            nonce, to, value, data = fields[0], fields[3], fields[4], fields[5]
+        nonce = int.from_bytes(nonce, "big")
+        if nonce < self.nonces.get(sender, 0):
+            raise RpcError(-32000, "nonce too low")
+        self.nonces[sender] = nonce + 1
+        to = "0x" + to.hex()
+        logs = []
+        status = self.execute(sender, to, int.from_bytes(value, "big"), data, logs)
+        for index, entry in enumerate(logs):
+            entry.update(transactionHash=tx_hash, logIndex=hex(index), removed=False)
+        self.known.add(tx_hash)
+        self.mempool.append(
+            {
+                "transactionHash": tx_hash,
+                "from": sender,
+                "to": to,
+                "cumulativeGasUsed": hex(GAS_ESTIMATE),
+                "gasUsed": hex(GAS_ESTIMATE),
+                "effectiveGasPrice": hex(BASE_FEE + PRIORITY_FEE),
+                "contractAddress": None,
+                "logs": logs,
+                "logsBloom": "0x" + "00" * 256,
+                "status": hex(status),
+                "type": hex(raw[0]) if raw[0] < 0x80 else "0x0",
+            }
+        )
+        if not self.block_time:
+            self.mine()
+        return tx_hash
+
+    def rpc_eth_getLogs(self, log_filter):
+        from_block = self._block_number(log_filter.get("fromBlock", "latest"))
+        to_block = self._block_number(log_filter.get("toBlock", "latest"))
+        addresses = log_filter.get("address")
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        if addresses is not None:
+            addresses = {address.lower() for address in addresses}
+        topics = log_filter.get("topics") or []
+        matches = []
+        for entry in self.logs:
+            if not from_block <= int(entry["blockNumber"], 16) <= to_block:
+                continue
+            if addresses is not None and entry["address"] not in addresses:
+                continue
+            if all(
+                wanted is None
+                or entry["topics"][i] in (wanted if isinstance(wanted, list) else [wanted])
+                for i, wanted in enumerate(topics)
+            ):
+                matches.append(entry)
+        return matches
+
+    def rpc_eth_getTransactionReceipt(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+    def rpc_eth_getTransactionByHash(self, tx_hash):
+        receipt = self.receipts.get(tx_hash)
+        if receipt is None:
+            return None
+        return {
+            "hash": tx_hash,
+            "blockHash": receipt["blockHash"],
+            "blockNumber": receipt["blockNumber"],
+            "from": receipt["from"],
+            "to": receipt["to"],
+        }
+
+    def call(self, to, data):
+        selector, args = data[:4], data[4:]
+        if to == self.token and selector == BALANCE_OF:
+            (owner,) = decode(["address"], args)
+            return encode(["uint256"], [self.tokens.get(owner.lower(), 0)])
+        if to == self.token and selector == ALLOWANCE:
+            owner, _ = decode(["address", "address"], args)
+            return encode(["uint256"], [self.allowances.get(owner.lower(), 0)])
+        if to == self.stake and selector == PENDING_USER_REWARD:
+            (owner,) = decode(["address"], args)
+            return encode(["uint256"], [self.rewards.get(owner.lower(), 0)])
+        if to == self.multicall and selector == AGGREGATE3:
+            (calls,) = decode(["(address,bool,bytes)[]"], args)
+            results = []
+            for target, allow_failure, call_data in calls:
+                try:
+                    results.append((True, self.call(target.lower(), call_data)))
+                except RpcError:
+                    if not allow_failure:
+                        raise
+                    results.append((False, b""))
+            return encode(["(bool,bytes)[]"], [results])
+        raise RpcError(3, "execution reverted")
+
+    def emit(self, logs, event_topic, source, target, amount):
+        logs.append(
+            {
+                "address": self.token,
+                "topics": [event_topic, topic(source), topic(target)],
+                "data": "0x" + amount.to_bytes(32, "big").hex(),
+            }
+        )
+
+    def execute(self, sender, to, value, data, logs):
+        if value:
+            if self.native.get(sender, 0) < value:
+                return 0
+            self.native[sender] -= value
+            self.native[to] = self.native.get(to, 0) + value
+        selector, args = data[:4], data[4:]
+        if to == self.token and selector == APPROVE:
+            spender, amount = decode(["address", "uint256"], args)
+            self.allowances[sender] = amount
+            self.emit(logs, APPROVAL_TOPIC, sender, spender, amount)
+        elif to == self.token and selector == TRANSFER:
+            recipient, amount = decode(["address", "uint256"], args)
+            if self.tokens.get(sender, 0) < amount:
+                return 0
+            self.tokens[sender] -= amount
+            self.tokens[recipient.lower()] = self.tokens.get(recipient.lower(), 0) + amount
+            self.emit(logs, TRANSFER_TOPIC, sender, recipient, amount)
+        elif to == self.stake and selector == STAKE:
+            amount = decode(["address", "address", "address", "uint96"], args)[3]
+            if self.allowances.get(sender, 0) < amount or self.tokens.get(sender, 0) < amount:
+                return 0
+            self.tokens[sender] -= amount
+            self.allowances[sender] -= amount
+            self.emit(logs, TRANSFER_TOPIC, sender, self.stake, amount)
+        elif to == self.faucet:
+            self.tokens[sender] = self.tokens.get(sender, 0) + TOKEN_BALANCE
+            self.emit(logs, TRANSFER_TOPIC, self.faucet, sender, TOKEN_BALANCE)
+        elif to == self.stake and selector == CLAIM_REWARD:
+            reward = self.rewards.pop(sender, 0)
+            self.tokens[sender] = self.tokens.get(sender, 0) + reward
+            self.emit(logs, TRANSFER_TOPIC, self.stake, sender, reward)
+        return 1
+
+    def serve(self, host="127.0.0.1", port=0):
+        chain = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                chain.http_requests += 1
+                if chain.latency:
+                    time.sleep(chain.latency)
+                if not chain.admit(len(body) if isinstance(body, list) else 1):
+                    self.send_response(429)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if isinstance(body, list):
+                    response = [chain.handle(request) for request in body]
+                else:
+                    response = chain.handle(body)
+                data = json.dumps(response).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+
+def run_scenario(chain, scenario, file_manager, funder_key):
+    if scenario == "balances":
+        main.get_token_balance_wallets(file_manager)
+    elif scenario == "fund":
+        main.send_bnb_to_wallets(file_manager, funder_key, 0.001)
+    elif scenario == "stake":
+        main.stake_wallets(file_manager)
+    elif scenario == "claim":
+        main.claim_rewards_wallets(file_manager)
+    elif scenario in ("storm", "storm-phased"):
+        main.FURYSTORM_STREAMING = scenario == "storm"
+        storm_manager = main.FileManager(file_manager.filename + ".storm")
+        storm_manager.clear_file()
+        main.furystorm(storm_manager, file_manager, funder_key, 1)
+
+
+def benchmark(chain, sizes, scenarios, work_dir):
+    funder = Account.create()
+    chain.native[funder.address.lower()] = 10**30
+    results = []
+    for size in sizes:
+        file_manager = main.FileManager(os.path.join(work_dir, f"wallets-{size}.txt"))
+        file_manager.clear_file()
+        main.create_wallets(file_manager, size)
+        addresses = main.wallet_addresses_from(file_manager.get_all_wallet_data_from_file())
+        chain.seed(addresses)
+        for scenario in scenarios:
+            if scenario.startswith("storm"):
+                # Storms claim and stake on the same wallets, so each one
+                # starts from fresh balances and an empty allowance cache.
+                chain.seed(addresses)
+                main.allowance_cache = main.AllowanceCache(
+                    os.path.join(work_dir, f"allowances-{scenario}-{size}.json")
+                )
+            chain.reset_counters()
+            main.metrics.reset_stats()
+            start = time.perf_counter()
+            run_scenario(chain, scenario, file_manager, funder.key.hex())
+            elapsed = time.perf_counter() - start
+            results.append(
+                {
+                    "scenario": scenario,
+                    "wallets": size,
+                    "seconds": round(elapsed, 3),
+                    "wallets_per_second": round(size / elapsed, 1),
+                    "rpc_calls_per_wallet": round(chain.calls / size, 3),
+                    "http_requests_per_wallet": round(chain.http_requests / size, 3),
+                    "throttled": chain.throttled,
+                    "methods": dict(chain.methods),
+                }
+            )
+            log_result(results[-1])
+    return results
+
+
+def log_result(result):
+    main.log.warning(
+        f"{result['scenario']:<9} {result['wallets']:>6} wallets "
+        f"{result['seconds']:>8.2f} s {result['wallets_per_second']:>9.1f} wallets/s "
+        f"{result['rpc_calls_per_wallet']:>6.3f} calls/wallet "
+        f"{result['http_requests_per_wallet']:>7.3f} requests/wallet"
+        + (f" {result['throttled']:>5} throttled" if result.get("throttled") else "")
+    )
+
+
+def compare(results, baseline_file, tolerance):
+    with open(baseline_file, "r", encoding="utf-8") as file:
+        baseline = {
+            (result["scenario"], result["wallets"]): result for result in json.load(file)
+        }
+    regressions = []
+    for result in results:
+        before = baseline.get((result["scenario"], result["wallets"]))
+        if before is None:
+            continue
+        if result["wallets_per_second"] < before["wallets_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{result['scenario']} x{result['wallets']}: "
+                f"{before['wallets_per_second']} -> {result['wallets_per_second']} wallets/s"
+            )
+        if result["rpc_calls_per_wallet"] > before["rpc_calls_per_wallet"] * (1 + tolerance):
+            regressions.append(
+                f"{result['scenario']} x{result['wallets']}: "
+                f"{before['rpc_calls_per_wallet']} -> {result['rpc_calls_per_wallet']} calls/wallet"
+            )
+    for regression in regressions:
+        main.log.error(f"Regression: {regression}")
+    return not regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the batch loops against a local mock chain"
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, SIZES)),
+        help="comma separated wallet counts",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(DEFAULT_SCENARIOS),
+        help=f"comma separated subset of {','.join(SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="milliseconds added to every request"
+    )
+    parser.add_argument(
+        "--block-time",
+        type=float,
+        default=0.0,
+        help="seconds between mined blocks, 0 mines every transaction at once",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=0,
+        help="calls per second the mock node allows before answering 429",
+    )
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="fail when slower than this saved JSON file")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed slowdown when comparing"
+    )
+    parser.add_argument("--verbose", action="store_true", help="keep per-wallet log lines")
+    return parser.parse_args()
+
+
+def main_benchmark():
+    global main
+    args = parse_args()
+    scenarios = [scenario for scenario in args.scenarios.split(",") if scenario]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    chain = MockChain(
+        latency=args.latency / 1000, block_time=args.block_time, rate_limit=args.rate_limit
+    )
+    os.environ["NULINK_RPC_URLS"] = chain.serve()
+    main = importlib.import_module("main")
+    if not args.verbose:
+        main.log.setLevel(logging.WARNING)
+    work_dir = tempfile.mkdtemp(prefix="nulink-benchmark-")
+    main.JOURNAL_DIR = os.path.join(work_dir, "journal")
+    main.allowance_cache = main.AllowanceCache(os.path.join(work_dir, "allowances.json"))
+    try:
+        results = benchmark(
+            chain, [int(size) for size in args.sizes.split(",")], scenarios, work_dir
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_benchmark()
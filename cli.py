@@ -0,0 +1,335 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+
+# main.py connects to the RPC pool and loads web3/eth_account at import, so it
+# is only imported once a command actually runs; --help and --dry-run stay fast.
+
+WALLET_FILE = "config/ethereum_wallet.txt"
+NODE_FILE = "config/private_nulink.txt"
+MAIN_KEY_FILE = "config/private_main.txt"
+
+# op: (help, wallet file it reads, {param: type})
+COMMANDS = {
+    "balance": ("Check NLK balance of node wallets", "node", {}),
+    "create": ("Create new wallets", "wallet", {"count": int}),
+    "delete": ("Delete the new wallets file", "wallet", {"yes": bool}),
+    "fund": ("Send BNB to new wallets from main", "wallet", {"amount": float}),
+    "faucet": ("Claim NLK from the faucet", "wallet", {}),
+    "rewards": ("Check pending node rewards", "node", {}),
+    "stake": ("Stake NLK from node wallets", "node", {}),
+    "claim": ("Claim node rewards", "node", {}),
+    "send-nlk": ("Send NLK from new wallets to node wallets", "wallet", {}),
+    "furystorm": (
+        "Delete, create, fund, faucet, send, claim and stake in a loop",
+        "wallet",
+        {"times": int, "amount": float},
+    ),
+    "send-dead": (
+        "Send NLK from one node wallet to the dead address",
+        "node",
+        {"wallet": int, "amount": int},
+    ),
+    "history": ("Report balances from the local event index", "node", {}),
+    "fund-nlk": (
+        "Send NLK from main to node wallets through the disperse contract",
+        "node",
+        {"amount": float},
+    ),
+    "deploy-disperse": ("Deploy the disperse contract from the main wallet", "main", {}),
+}
+MAIN_KEY_COMMANDS = ("fund", "furystorm", "fund-nlk", "deploy-disperse")
+# Left out, these fall back to input() prompts in main.py, which would hang
+# a cron job or a job file waiting on stdin.
+REQUIRED = {
+    "create": ("count",),
+    "delete": ("yes",),
+    "fund": ("amount",),
+    "send-dead": ("wallet", "amount"),
+    "fund-nlk": ("amount",),
+}
+OPTIONS = ("concurrency", "metrics_port", "wallets", "rpc")
+
+
+def parse_range(value):
+    if value is None:
+        return None
+    start, _, stop = str(value).partition("-")
+    try:
+        start = int(start)
+        stop = int(stop) if stop else start
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid wallet range {value!r}, use e.g. 1-100")
+    if start < 1 or stop < start:
+        raise argparse.ArgumentTypeError(f"invalid wallet range {value!r}")
+    return start - 1, stop
+
+
+def load_job(filename):
+    with open(filename, "r", encoding="utf-8") as file:
+        if filename.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                sys.exit("YAML job files need PyYAML (pip install pyyaml), or use JSON")
+            job = yaml.safe_load(file)
+        else:
+            job = json.load(file)
+    if not isinstance(job, dict) or not isinstance(job.get("steps"), list):
+        sys.exit(f"{filename}: a job needs a 'steps' list")
+    steps = []
+    for number, step in enumerate(job["steps"], start=1):
+        if isinstance(step, str):
+            step = {"op": step}
+        step = dict(step)
+        op = step.pop("op", None)
+        if op not in COMMANDS:
+            sys.exit(f"{filename}: step {number} has unknown op {op!r}")
+        params = COMMANDS[op][2]
+        unknown = set(step) - set(params)
+        if unknown:
+            sys.exit(f"{filename}: step {number} ({op}) has unknown keys {sorted(unknown)}")
+        missing = [key for key in REQUIRED.get(op, ()) if step.get(key) is None]
+        if missing:
+            sys.exit(f"{filename}: step {number} ({op}) needs {', '.join(missing)}")
+        values = {}
+        for key, value in step.items():
+            kind = params[key]
+            # bool("false") is True, so only real booleans are accepted.
+            if kind is bool and not isinstance(value, bool):
+                sys.exit(f"{filename}: step {number} ({op}) {key} must be true or false")
+            try:
+                values[key] = kind(value)
+            except (TypeError, ValueError):
+                sys.exit(f"{filename}: step {number} ({op}) {key} must be {kind.__name__}")
+        if op == "delete" and not values["yes"]:
+            sys.exit(f"{filename}: step {number} (delete) needs yes: true")
+        steps.append((op, values))
+    options = {}
+    for key in OPTIONS:
+        if key not in job:
+            continue
+        value = job[key]
+        if key == "wallets":
+            try:
+                value = parse_range(value)
+            except argparse.ArgumentTypeError as e:
+                sys.exit(f"{filename}: {e}")
+        elif key == "rpc":
+            if isinstance(value, str):
+                value = [value]
+            if not isinstance(value, list) or not all(isinstance(url, str) for url in value):
+                sys.exit(f"{filename}: rpc must be a URL or a list of URLs")
+        elif isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            sys.exit(f"{filename}: {key} must be a whole number")
+        options[key] = value
+    return steps, options
+
+
+def is_wallet_line(line):
+    # Same rows as WalletTable.parse_line in main.py, so --wallets counts match.
+    parts = line.strip().split(":")
+    return len(parts) == 3 or (len(parts) == 1 and bool(parts[0]))
+
+
+def count_wallets(filename, wallet_range):
+    if not os.path.exists(filename):
+        return 0
+    with open(filename, "r", encoding="utf-8") as file:
+        total = sum(1 for line in file if is_wallet_line(line))
+    if wallet_range is None:
+        return total
+    return max(0, min(total, wallet_range[1]) - wallet_range[0])
+
+
+def plan(steps, args):
+    files = {"wallet": args.wallet_file, "node": args.node_file, "main": args.main_key_file}
+    print(f"Plan: {len(steps)} step(s)")
+    if args.wallets:
+        print(f"  wallet rows {args.wallets[0] + 1}-{args.wallets[1]}")
+    if args.concurrency:
+        print(f"  async concurrency {args.concurrency}")
+    for number, (op, params) in enumerate(steps, start=1):
+        source = files[COMMANDS[op][1]]
+        details = ", ".join(f"{key}={value}" for key, value in params.items())
+        print(
+            f"  {number}. {op:<15} {count_wallets(source, args.wallets):>6} wallets "
+            f"from {source}" + (f" ({details})" if details else "")
+        )
+
+
+def run(steps, args):
+    if args.rpc:
+        os.environ["NULINK_RPC_URLS"] = ",".join(args.rpc)
+    import main
+
+    if main.web3 is None:
+        sys.exit("No RPC endpoint is reachable")
+    if args.concurrency:
+        main.set_async_concurrency(args.concurrency)
+    main.metrics.serve(args.metrics_port)
+    if main.USE_MULTICALL:
+        main.multicall.is_available()
+
+    private_key_main = None
+    if any(op in MAIN_KEY_COMMANDS for op, _ in steps):
+        private_key_main = main.load_private_key_main(args.main_key_file)
+        if private_key_main is None:
+            sys.exit(1)
+
+    for number, (op, params) in enumerate(steps, start=1):
+        main.log.info(f"Step {number}/{len(steps)}: {op}")
+        start = time.monotonic()
+        main.contracts.reset_stats()
+        main.gas_limits.reset_stats()
+        main.metrics.reset_stats()
+        main.allowance_cache.reset_stats()
+        # --wallets selects rows of the file the command reads; the other
+        # file (e.g. the node wallets that send-nlk pays) is used whole.
+        kind = COMMANDS[op][1]
+        file_manager = main.FileManager(
+            args.wallet_file, args.wallets if kind == "wallet" else None
+        )
+        nulink_manager = main.FileManager(
+            args.node_file, args.wallets if kind == "node" else None
+        )
+        actions(main, file_manager, nulink_manager, private_key_main)[op](**params)
+        main.contracts.log_stats()
+        main.gas_limits.log_stats()
+        main.allowance_cache.log_stats()
+        main.metrics.log_stats()
+        main.log.info(f"Step {number} ({op}) finished in {time.monotonic() - start:.1f} s")
+
+
+def actions(main, file_manager, nulink_manager, private_key_main):
+    return {
+        "balance": lambda: main.get_token_balance_wallets(nulink_manager),
+        "create": lambda count=None: main.create_wallets(file_manager, count),
+        "delete": lambda yes=False: main.delete_wallets(
+            file_manager, "y" if yes else None
+        ),
+        "fund": lambda amount=None: main.send_bnb_to_wallets(
+            file_manager, private_key_main, amount
+        ),
+        "faucet": lambda: main.claim_faucet_to_wallets(file_manager),
+        "rewards": lambda: main.get_pending_user_reward_wallets(nulink_manager),
+        "stake": lambda: main.stake_wallets(nulink_manager),
+        "claim": lambda: main.claim_rewards_wallets(nulink_manager),
+        "send-nlk": lambda: main.send_nulink_to_wallets(file_manager, nulink_manager),
+        "furystorm": lambda times=1, amount=0.001: main.furystorm(
+            file_manager, nulink_manager, private_key_main, times, amount
+        ),
+        "send-dead": lambda wallet=None, amount=None: main.send_nulink_to_dead_wallets(
+            nulink_manager, amount, wallet
+        ),
+        "history": lambda: main.wallet_history_report(nulink_manager),
+        "fund-nlk": lambda amount=None: main.send_nulink_from_main(
+            nulink_manager, private_key_main, amount
+        ),
+        "deploy-disperse": lambda: main.deploy_disperse(private_key_main),
+    }
+
+
+def add_options(parser, default=None):
+    # Subparsers get the same flags with SUPPRESS so they can be given after the
+    # command without resetting values given before it.
+    def value(normal):
+        return normal if default is None else default
+
+    parser.add_argument("--wallet-file", default=value(WALLET_FILE), help="new wallets file")
+    parser.add_argument("--node-file", default=value(NODE_FILE), help="node wallets file")
+    parser.add_argument(
+        "--main-key-file", default=value(MAIN_KEY_FILE), help="main wallet key file"
+    )
+    parser.add_argument(
+        "--wallets",
+        type=parse_range,
+        default=value(None),
+        help="only use wallet rows START-END (1-based)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=value(0),
+        help="wallets processed concurrently (0 = off)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=value(None),
+        help="serve Prometheus metrics on this port",
+    )
+    parser.add_argument(
+        "--rpc",
+        action="append",
+        default=value(None),
+        help="RPC endpoint URL, repeat for several endpoints",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=value(False),
+        help="print the plan without touching the chain",
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Run Nulink wallet operations without the menu",
+        allow_abbrev=False,
+    )
+    add_options(parser)
+    subparsers = parser.add_subparsers(dest="op", required=True, metavar="command")
+
+    for op, (help_text, _, params) in COMMANDS.items():
+        sub = subparsers.add_parser(
+            op, help=help_text, description=help_text, allow_abbrev=False
+        )
+        for param, kind in params.items():
+            required = param in REQUIRED.get(op, ())
+            if kind is bool:
+                sub.add_argument(
+                    f"--{param}", action="store_true", required=required, help="confirm"
+                )
+            else:
+                sub.add_argument(f"--{param}", type=kind, required=required)
+        add_options(sub, argparse.SUPPRESS)
+
+    job = subparsers.add_parser(
+        "run", help="Run the steps of a JSON/YAML job file", allow_abbrev=False
+    )
+    job.add_argument("job_file")
+    add_options(job, argparse.SUPPRESS)
+    return parser
+
+
+def main_cli(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.op == "run":
+        steps, options = load_job(args.job_file)
+        # Command line flags win over the job file.
+        for key, value in options.items():
+            if not getattr(args, key):
+                setattr(args, key, value)
+    else:
+        params = {
+            key: getattr(args, key)
+            for key in COMMANDS[args.op][2]
+            if getattr(args, key) not in (None, False)
+        }
+        steps = [(args.op, params)]
+
+    if args.dry_run:
+        plan(steps, args)
+        return
+    run(steps, args)
+
+
+if __name__ == "__main__":
+    main_cli()
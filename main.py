@@ -1,30 +1,696 @@
 from eth_account import Account
-from web3 import Web3
+from web3 import Web3, AsyncWeb3, AsyncHTTPProvider, HTTPProvider
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import argparse
+import bisect
+import contextlib
 import time
 import random
 import logging
 import json
+import queue
+import threading
+import atexit
+import functools
+import os
+import mmap
+import socket
+import sqlite3
+import struct
+import shutil
+from array import array
 from colorlog import ColoredFormatter
+from eth_abi import decode as abi_decode
 from colorama import Fore, Style
 from decimal import Decimal
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from web3._utils.method_formatters import receipt_formatter
+from web3._utils.caching import generate_cache_key
+from web3._utils.request import _async_session_cache, make_post_request
+from web3.datastructures import AttributeDict
+from web3.providers import JSONBaseProvider
+from hexbytes import HexBytes
+
+
+RPC_TIMEOUT = 10
+RPC_POOL_SIZE = 32  # keep-alive connections per endpoint, above MAX_IN_FLIGHT
+RPC_KEEPALIVE = 60  # seconds an idle connection is kept open
+RPC_HTTP2 = False  # True to talk HTTP/2 through httpx[http2] when installed
+RPC_PROBE_INTERVAL = 30  # seconds between re-probes of failed endpoints
+RPC_MAX_ERRORS = 3  # consecutive errors before an endpoint is taken out
+RPC_RATE_LIMIT = None  # requests/s per endpoint to start from, None until throttled
+RPC_RATE_MIN = 1.0  # the learned rate never drops below this
+RPC_RATE_DECREASE = 0.85  # rate kept after a rate-limit error
+RPC_BACKOFF_BASE = 0.25  # seconds, doubled per consecutive rate-limit error
+RPC_BACKOFF_MAX = 30
+RPC_RATE_RETRIES = 6  # retries of a throttled request before giving up
+RATE_LIMIT_CODES = (429, -32005)
+RATE_LIMIT_MESSAGES = ("limit exceeded", "rate limit", "too many requests", "request limit")
+IDEMPOTENT_METHODS = {
+    "eth_blockNumber",
+    "eth_call",
+    "eth_chainId",
+    "eth_estimateGas",
+    "eth_feeHistory",
+    "eth_gasPrice",
+    "eth_getBalance",
+    "eth_getBlockByHash",
+    "eth_getBlockByNumber",
+    "eth_getBlockReceipts",
+    "eth_getCode",
+    "eth_getLogs",
+    "eth_getTransactionByHash",
+    "eth_getTransactionCount",
+    "eth_getTransactionReceipt",
+    "eth_maxPriorityFeePerGas",
+    "net_version",
+    "web3_clientVersion",
+}
+METRICS_PORT = None  # e.g. 9100 to serve Prometheus metrics on localhost
+METRICS_SAMPLES = 10000  # latencies kept per series for the summary table
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 180)
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(METRICS_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.samples = deque(maxlen=METRICS_SAMPLES)
+        self.window_errors = 0
+
+    def observe(self, elapsed, error=False):
+        self.buckets[bisect.bisect_left(METRICS_BUCKETS, elapsed)] += 1
+        self.count += 1
+        self.total += elapsed
+        self.samples.append(elapsed)
+        if error:
+            self.errors += 1
+            self.window_errors += 1
+
+    def percentile(self, q):
+        samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+
+class Metrics:
+    def __init__(self):
+        self.series = {}
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.server = None
+
+    def observe(self, operation, elapsed, endpoint=None, error=False):
+        key = (operation, endpoint)
+        with self.lock:
+            histogram = self.series.get(key)
+            if histogram is None:
+                histogram = self.series[key] = Histogram()
+            histogram.observe(elapsed, error)
+
+    @contextlib.contextmanager
+    def timer(self, operation, endpoint=None):
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.observe(operation, time.monotonic() - start, endpoint, error=True)
+            raise
+        self.observe(operation, time.monotonic() - start, endpoint)
+
+    def reset_stats(self):
+        with self.lock:
+            for histogram in self.series.values():
+                histogram.samples.clear()
+                histogram.window_errors = 0
+            self.started = time.monotonic()
+
+    def log_stats(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        with self.lock:
+            rows = [
+                (operation, endpoint, histogram)
+                for (operation, endpoint), histogram in sorted(
+                    self.series.items(), key=lambda item: (item[0][0], item[0][1] or "")
+                )
+                if histogram.samples
+            ]
+            if not rows:
+                return
+            log.info(
+                f"{'Operation':<32} {'endpoint':<28} {'count':>6} {'err':>4} "
+                f"{'p50':>8} {'p95':>8} {'p99':>8} {'per s':>7}"
+            )
+            for operation, endpoint, histogram in rows:
+                p50, p95, p99 = (
+                    f"{histogram.percentile(q) * 1000:.0f}ms" for q in (50, 95, 99)
+                )
+                host = urlparse(endpoint).netloc if endpoint else "-"
+                log.info(
+                    f"{operation:<32} {host:<28} {len(histogram.samples):>6} "
+                    f"{histogram.window_errors:>4} {p50:>8} {p95:>8} {p99:>8} "
+                    f"{len(histogram.samples) / elapsed:>7.1f}"
+                )
 
+    def render(self):
+        lines = [
+            "# HELP nulink_operation_seconds Latency of RPC calls and transaction phases.",
+            "# TYPE nulink_operation_seconds histogram",
+        ]
+        errors = [
+            "# HELP nulink_operation_errors_total Failed RPC calls and transaction phases.",
+            "# TYPE nulink_operation_errors_total counter",
+        ]
+        with self.lock:
+            for (operation, endpoint), histogram in sorted(
+                self.series.items(), key=lambda item: (item[0][0], item[0][1] or "")
+            ):
+                labels = f'operation="{operation}",endpoint="{endpoint or ""}"'
+                cumulative = 0
+                for bound, count in zip(METRICS_BUCKETS, histogram.buckets):
+                    cumulative += count
+                    lines.append(
+                        f'nulink_operation_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'nulink_operation_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}'
+                )
+                lines.append(f"nulink_operation_seconds_sum{{{labels}}} {histogram.total}")
+                lines.append(f"nulink_operation_seconds_count{{{labels}}} {histogram.count}")
+                errors.append(f"nulink_operation_errors_total{{{labels}}} {histogram.errors}")
+        return "\n".join(lines + errors) + "\n"
+
+    def serve(self, port=METRICS_PORT, host="127.0.0.1"):
+        if port is None or self.server is not None:
+            return
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        log.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+
+metrics = Metrics()
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = [
+            (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+class SessionHTTPProvider(HTTPProvider):
+    """HTTPProvider that posts through one pooled session shared by all threads.
+
+    web3 caches its default session per thread, so every pipeline worker
+    opened its own connections to the same node.
+    """
+
+    def __init__(self, url, pool_size=RPC_POOL_SIZE, http2=RPC_HTTP2):
+        super().__init__(url, request_kwargs={"timeout": RPC_TIMEOUT})
+        self.http2 = False
+        if http2:
+            try:
+                import httpx
+
+                self.session = httpx.Client(
+                    http2=True,
+                    timeout=RPC_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=pool_size,
+                        max_keepalive_connections=pool_size,
+                        keepalive_expiry=RPC_KEEPALIVE,
+                    ),
+                )
+                self.http2 = True
+                return
+            except ImportError:
+                log.warning("RPC_HTTP2 needs httpx[http2], falling back to HTTP/1.1")
+        self.session = requests.Session()
+        adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, request_data):
+        headers = self.get_request_headers()
+        if self.http2:
+            response = self.session.post(
+                self.endpoint_uri, content=request_data, headers=headers
+            )
+        else:
+            response = self.session.post(
+                self.endpoint_uri, data=request_data, headers=headers, timeout=RPC_TIMEOUT
+            )
+        response.raise_for_status()
+        return response.content
+
+    def make_request(self, method, params):
+        return self.decode_rpc_response(self.post(self.encode_rpc_request(method, params)))
+
+    def connection_stats(self):
+        if self.http2:
+            return None, None
+        connections = requests_made = 0
+        for adapter in set(self.session.adapters.values()):
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools[key]
+                connections += pool.num_connections
+                requests_made += pool.num_requests
+        return connections, requests_made
+
+
+def is_rate_limit_message(message):
+    # "gas limit exceeded" is a failed transaction, not a throttled request.
+    message = str(message).lower()
+    return "gas" not in message and any(text in message for text in RATE_LIMIT_MESSAGES)
+
+
+def rate_limit_delay(outcome):
+    """Seconds the provider asked to wait when outcome (a response or an
+    exception) is a rate-limit rejection, 0 if it gave none, None otherwise."""
+    if isinstance(outcome, list):
+        delays = [rate_limit_delay(item) for item in outcome]
+        delays = [delay for delay in delays if delay is not None]
+        return max(delays) if delays else None
+    if isinstance(outcome, dict):
+        error = outcome.get("error")
+        if not isinstance(error, dict):
+            return None
+        if error.get("code") in RATE_LIMIT_CODES or is_rate_limit_message(
+            error.get("message", "")
+        ):
+            return 0
+        return None
+    if isinstance(outcome, Exception):
+        response = getattr(outcome, "response", None)
+        status = getattr(response, "status_code", getattr(outcome, "status", None))
+        if status == 429:
+            headers = getattr(response, "headers", None) or getattr(outcome, "headers", None) or {}
+            try:
+                return float(headers.get("Retry-After", 0))
+            except (TypeError, ValueError):
+                return 0
+        if is_rate_limit_message(outcome):
+            return 0
+    return None
 
-def check_and_return_active_rpc(rpc_urls):
 
-    for rpc_url in rpc_urls:
-        web3 = Web3(Web3.HTTPProvider(rpc_url))
-        if web3.is_connected():
-            return web3
-    return None
+class RateLimiter:
+    """Token bucket that learns an endpoint's request cap.
+
+    It lets everything through until the first rate-limit error, which sets
+    the rate a little below what got through in the last second and pauses
+    the endpoint for a jittered, exponentially growing backoff. Successes
+    raise the rate by 10% a second, slowing to one request/s per second
+    near the rate that was last rejected, so it settles just under the cap
+    instead of swinging between bursts and rejections.
+    """
+
+    limiters = {}
+
+    def __init__(self, rate=RPC_RATE_LIMIT):
+        self.lock = threading.Lock()
+        self.rate = rate
+        self.tokens = rate or 0
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.strikes = 0
+        self.last_cut = 0
+        self.ceiling = None
+        self.recent = deque()  # (time, cost) of the last second's successes
+        self.throttled = 0
+
+    @classmethod
+    def for_url(cls, url):
+        # Shared by the sync pool and the async engine talking to one node.
+        return cls.limiters.setdefault(url, cls())
+
+    def reserve(self, cost=1):
+        """Takes cost tokens and returns how long to wait before sending."""
+        with self.lock:
+            now = time.monotonic()
+            wait = max(0, self.blocked_until - now)
+            if self.rate is None:
+                return wait
+            burst = max(1.0, self.rate / 4)
+            self.tokens = min(burst, self.tokens + max(0, now - self.updated) * self.rate)
+            self.updated = max(now, self.updated)
+            self.tokens -= cost
+            if self.tokens < 0:
+                # The deficit is paid off from the end of any backoff, so
+                # requests queued during one are spread out after it rather
+                # than all released the moment it ends.
+                wait = max(wait, max(0, self.updated - now) - self.tokens / self.rate)
+            return wait
+
+    def acquire(self, cost=1):
+        wait = self.reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+
+    def backing_off(self):
+        return time.monotonic() < self.blocked_until
+
+    def _last_second(self, now):
+        while self.recent and self.recent[0][0] < now - 1:
+            self.recent.popleft()
+        return sum(cost for _, cost in self.recent)
+
+    def record_success(self, cost=1):
+        with self.lock:
+            now = time.monotonic()
+            self.strikes = 0
+            self.recent.append((now, cost))
+            used = self._last_second(now)
+            # Only grow while the rate is actually being used.
+            if self.rate is None or used < self.rate / 2:
+                return
+            if self.ceiling and self.ceiling * 0.95 < self.rate < self.ceiling * 1.1:
+                self.rate += cost / self.rate
+            else:
+                self.rate += cost * 0.1
+
+    def record_limit(self, retry_after=0, cost=1, attempt=1):
+        """Lowers the rate and starts a backoff; returns its length.
+
+        attempt counts the rejections of one request, so its backoff keeps
+        growing even while other requests succeed in between.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.throttled += 1
+            # Requests already in flight come back throttled together; only
+            # the first of them lowers the rate and lengthens the backoff.
+            if now - self.last_cut >= 1:
+                self.last_cut = now
+                self.strikes += 1
+                sent = self._last_second(now) + cost
+                self.ceiling = min(self.rate, sent) if self.rate else sent
+                self.rate = max(RPC_RATE_MIN, self.ceiling * RPC_RATE_DECREASE)
+            strikes = max(self.strikes, attempt)
+            backoff = min(RPC_BACKOFF_MAX, RPC_BACKOFF_BASE * 2 ** (strikes - 1))
+            delay = max(retry_after or 0, random.uniform(backoff / 2, backoff))
+            self.blocked_until = max(self.blocked_until, now + delay)
+            self.tokens = 0
+            self.updated = self.blocked_until
+            return delay
+
+
+class RpcEndpoint:
+    def __init__(self, url):
+        self.url = url
+        self.provider = SessionHTTPProvider(url)
+        self.limiter = RateLimiter.for_url(url)
+        self.latency = None
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.healthy = False
+        self.last_error = None
+
+    def error_rate(self):
+        return self.errors / self.requests if self.requests else 0.0
+
+    def score(self):
+        latency = self.latency if self.latency is not None else RPC_TIMEOUT
+        return latency * (1 + 10 * self.error_rate())
+
+    def record_success(self, elapsed):
+        self.requests += 1
+        self.consecutive_errors = 0
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * elapsed
+
+    def record_error(self, error):
+        self.requests += 1
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.last_error = str(error)
+        if self.consecutive_errors >= RPC_MAX_ERRORS:
+            self.healthy = False
+
+
+class RpcPool:
+    def __init__(self, urls, probe_interval=RPC_PROBE_INTERVAL):
+        self.endpoints = [RpcEndpoint(url) for url in urls]
+        self.probe_interval = probe_interval
+        self.lock = threading.Lock()
+        self.reprobe_thread = None
+
+    def probe(self, endpoint):
+        start = time.monotonic()
+        try:
+            connected = endpoint.provider.is_connected()
+        except Exception as e:
+            connected = False
+            endpoint.last_error = str(e)
+        with self.lock:
+            if connected:
+                endpoint.record_success(time.monotonic() - start)
+                endpoint.healthy = True
+            else:
+                endpoint.healthy = False
+        return connected
+
+    def probe_all(self):
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            return any(executor.map(self.probe, self.endpoints))
+
+    def healthy(self):
+        return [endpoint for endpoint in self.endpoints if endpoint.healthy]
+
+    def available(self):
+        # Endpoints backing off after a rate-limit error are used only when
+        # every other one is too.
+        healthy = self.healthy() or self.endpoints
+        return [e for e in healthy if not e.limiter.backing_off()] or healthy
+
+    def best(self):
+        return min(self.available(), key=lambda endpoint: endpoint.score())
+
+    def pick(self, exclude=()):
+        candidates = [e for e in self.available() if e not in exclude]
+        if not candidates:
+            candidates = [e for e in self.endpoints if e not in exclude]
+        if not candidates:
+            return None
+        weights = [1 / max(endpoint.score(), 0.001) for endpoint in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    def call(self, send, idempotent=True, operation="rpc", cost=1, retries=RPC_RATE_RETRIES):
+        tried = []
+        last_error = None
+        attempts = len(self.endpoints) if idempotent else 1
+        throttled = 0
+        while len(tried) < attempts:
+            endpoint = self.pick(tried) if idempotent else self.best()
+            if endpoint is None:
+                break
+            endpoint.limiter.acquire(cost)
+            start = time.monotonic()
+            try:
+                response = send(endpoint)
+                retry_after = rate_limit_delay(response)
+            except Exception as e:
+                retry_after = rate_limit_delay(e)
+                if retry_after is None:
+                    tried.append(endpoint)
+                    last_error = e
+                    metrics.observe(operation, time.monotonic() - start, endpoint.url, True)
+                    with self.lock:
+                        endpoint.record_error(e)
+                    if not endpoint.healthy:
+                        log.warning(f"RPC {endpoint.url} marked unhealthy: {e}")
+                        self.start_reprobe()
+                    continue
+                response = e
+            if retry_after is not None:
+                # A rate-limit rejection means the node did not run the
+                # request, so even a transaction can be sent again. It is not
+                # counted against the endpoint's health.
+                metrics.observe(operation, time.monotonic() - start, endpoint.url, True)
+                throttled += 1
+                delay = endpoint.limiter.record_limit(retry_after, cost, throttled)
+                if throttled > retries:
+                    if isinstance(response, Exception):
+                        raise response
+                    return response
+                log.debug(
+                    f"RPC {endpoint.url} rate limited, now {endpoint.limiter.rate:.1f} req/s, "
+                    f"backing off {delay:.1f} s"
+                )
+                continue
+            elapsed = time.monotonic() - start
+            metrics.observe(operation, elapsed, endpoint.url)
+            endpoint.limiter.record_success(cost)
+            with self.lock:
+                endpoint.record_success(elapsed)
+            return response
+        raise last_error or ConnectionError("No RPC endpoint available")
+
+    def request(self, method, params):
+        return self.call(
+            lambda endpoint: endpoint.provider.make_request(method, params),
+            method in IDEMPOTENT_METHODS,
+            f"rpc.{method}",
+        )
 
-rpc_urls = [
-    "https://bsc-testnet-rpc.publicnode.com",
-    "https://bsc-testnet.blockpi.network/v1/rpc/public",
-    "https://endpoints.omniatech.io/v1/bsc/testnet/public"
-]
+    def request_sender(self, method, params):
+        # Goes to the endpoint transactions are sent to (see call), for reads
+        # that must agree with what that node has accepted.
+        response = self.call(
+            lambda endpoint: endpoint.provider.make_request(method, params),
+            False,
+            f"rpc.{method}",
+        )
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def start_reprobe(self):
+        with self.lock:
+            if self.reprobe_thread is not None and self.reprobe_thread.is_alive():
+                return
+            self.reprobe_thread = threading.Thread(target=self._reprobe_loop, daemon=True)
+            self.reprobe_thread.start()
+
+    def _reprobe_loop(self):
+        while True:
+            time.sleep(self.probe_interval)
+            failed = [endpoint for endpoint in self.endpoints if not endpoint.healthy]
+            if not failed:
+                return
+            for endpoint in failed:
+                if self.probe(endpoint):
+                    log.info(f"RPC {endpoint.url} is healthy again")
+
+    def log_stats(self):
+        log.info(
+            f"{'RPC endpoint':<55} {'ok':>3} {'reqs':>7} {'errors':>7} {'latency':>9} "
+            f"{'conns':>6} {'reuse':>6} {'429s':>6} {'limit':>9}"
+        )
+        for endpoint in self.endpoints:
+            latency = f"{endpoint.latency * 1000:.0f} ms" if endpoint.latency else "-"
+            connections, requests_made = endpoint.provider.connection_stats()
+            if connections:
+                reuse = f"{requests_made / connections:.1f}x"
+            else:
+                connections, reuse = "-", "-"
+            limiter = endpoint.limiter
+            limit = f"{limiter.rate:.1f}/s" if limiter.rate else "-"
+            log.info(
+                f"{endpoint.url:<55} {'yes' if endpoint.healthy else 'no':>3} "
+                f"{endpoint.requests:>7} {endpoint.errors:>7} {latency:>9} "
+                f"{connections:>6} {reuse:>6} {limiter.throttled:>6} {limit:>9}"
+            )
 
 
-web3 = check_and_return_active_rpc(rpc_urls)
+class PooledProvider(JSONBaseProvider):
+    def __init__(self, pool):
+        self.pool = pool
+        super().__init__()
+
+    @property
+    def endpoint_uri(self):
+        return self.pool.best().url
+
+    def get_request_kwargs(self):
+        return self.pool.best().provider.get_request_kwargs()
+
+    def make_request(self, method, params):
+        return self.pool.request(method, params)
+
+    def make_batch_request(self, request_data, size=1):
+        # A non-array reply is returned as is; RpcBatch treats it as batches
+        # being unsupported, after the pool has retried it if rate limited.
+        def send(endpoint):
+            return json.loads(endpoint.provider.post(request_data))
+
+        # RpcBatch splits a batch that keeps getting throttled, so it is
+        # retried only once here.
+        return self.pool.call(
+            send, idempotent=True, operation="rpc.batch", cost=size, retries=1
+        )
+
+
+def check_and_return_active_rpc(rpc_urls):
+    pool = RpcPool(rpc_urls)
+    if pool.probe_all():
+        atexit.register(pool.log_stats)
+        return Web3(PooledProvider(pool))
+    return None
+
+
+RPC_BATCH_SIZE = 100  # requests packed into one JSON-RPC batch
+RPC_BATCH_ATTEMPTS = 2  # sends of a batch that failed in transit before single calls
+USE_MULTICALL = True  # False to read through plain eth_call batches
+MULTICALL_BATCH_SIZE = 300  # calls merged into one aggregate3
+MAX_IN_FLIGHT = 16  # transactions sent before waiting for the oldest receipt
+RECEIPT_TIMEOUT = 180
+ASYNC_CONCURRENCY = 0  # wallets processed concurrently, 0 runs the sync loops
+GAS_PRICE_TTL = 15  # seconds a fetched gas price is reused
+GAS_PRICE_PERCENTILE = None  # e.g. 60 to bid at that percentile of recent blocks
+GAS_PRICE_BUMP = 1.0  # multiplier applied to every fee
+USE_EIP1559 = True  # type 2 transactions when the chain has a base fee
+GAS_WARMUP_SAMPLES = 3  # estimates taken per call shape before reusing them
+GAS_LIMIT_MARGIN = 1.1
+SIGN_WORKERS = os.cpu_count() or 1
+SIGN_PARALLEL_MIN = 64  # smaller batches are signed on the main thread
+WALLET_CHUNK_SIZE = 500  # wallets parsed per chunk when streaming a file
+ADDRESS_CACHE_SIZE = 4096  # private keys whose derived address is kept
+KEYGEN_CHUNK_SIZE = 2000  # wallets generated per worker task
+KEYGEN_PARALLEL_MIN = 1000  # smaller counts are generated on the main thread
+JOURNAL_DIR = "config/journal"
+APPROVE_AMOUNT = 2**256 - 5
+ALLOWANCE_CACHE_FILE = "config/allowances.json"
+LOG_CHUNK_BLOCKS = 5000  # largest block range per eth_getLogs request
+LOG_CHUNK_GROW_BELOW = 1000  # ranges returning fewer logs are doubled again
+EVENT_INDEX_DB = "config/events.sqlite"
+ALLOWANCE_RESYNC_BLOCKS = 200000  # older caches are dropped and read again
+CONFIRM_BY_BLOCKS = True  # False to poll every transaction hash on its own
+PREFLIGHT_SIMULATION = True  # eth_call pipelined transactions before signing them
+SIMULATION_BATCH = 20  # staged transactions simulated in one JSON-RPC batch
+SIMULATION_WINDOW = 0.2  # seconds a staged transaction waits for others to join its batch
+STAGED = "staged"  # returned by TxPipeline.submit before simulation decides
+SKIPPED = "skipped"  # returned when a wallet needs no transaction
+DISPERSE_FUNDING = False  # fund new wallets through the disperse contract
+DISPERSE_MAX_RECIPIENTS = 500  # recipients per disperse transaction, at most 1024
+DISPERSE_BLOCK_GAS_SHARE = 0.3  # share of the block gas limit one disperse may use
+BLOCK_POLL_INTERVAL = 0.5  # seconds between eth_blockNumber polls
+RECEIPT_RECHECK_AFTER = 15  # seconds before unmatched hashes are looked up directly
+SCANNED_BLOCKS_KEPT = 8  # recent block hash lists kept for hashes tracked late
+FURYSTORM_STREAMING = True  # False to run furystorm one phase at a time
+STREAM_IN_FLIGHT = 16  # transactions per step waiting for receipts
+STREAM_MAX_WALLETS = 64  # wallet chains in progress at once
 
 class CustomLogger:
     def __init__(self, level=logging.INFO):
@@ -65,9 +731,212 @@ custom_logger = CustomLogger(level=logging.INFO)
 log = custom_logger.getLogger()
 
 
+rpc_urls = [
+    "https://bsc-testnet-rpc.publicnode.com",
+    "https://bsc-testnet.blockpi.network/v1/rpc/public",
+    "https://endpoints.omniatech.io/v1/bsc/testnet/public"
+]
+if os.environ.get("NULINK_RPC_URLS"):
+    rpc_urls = [url for url in os.environ["NULINK_RPC_URLS"].split(",") if url]
+
+
+web3 = check_and_return_active_rpc(rpc_urls)
+
+
+class ContractRegistry:
+    def __init__(self, abi_dir="abi"):
+        self.abi_dir = abi_dir
+        self.hits = 0
+        self.loads = 0
+        self._abis = {}
+        self._contracts = {}
+        with open(f"{abi_dir}/contracts.json", mode="r", encoding="utf-8") as file:
+            self.addresses = json.load(file)
+
+    def abi(self, name):
+        if name in self._abis:
+            self.hits += 1
+            return self._abis[name]
+        with open(f"{self.abi_dir}/{name}.json", mode="r", encoding="utf-8") as file:
+            self._abis[name] = json.load(file)
+        self.loads += 1
+        return self._abis[name]
+
+    def address(self, key):
+        return Web3.to_checksum_address(self.addresses[key])
+
+    def contract_at(self, address, abi_name):
+        key = (Web3.to_checksum_address(address), abi_name)
+        contract = self._contracts.get(key)
+        if contract is not None:
+            self.hits += 1
+            return contract
+        contract = web3.eth.contract(address=key[0], abi=self.abi(abi_name))
+        self._contracts[key] = contract
+        return contract
+
+    def token(self):
+        return self.contract_at(self.addresses["nulink_token_address"], "erc20")
+
+    def stake_contract(self):
+        return self.contract_at(self.addresses["stake_contract_address"], "nulink")
+
+    def bond_operator(self):
+        return self.contract_at(
+            self.addresses["bond_operator_contract_address"], "bond"
+        )
+
+    def multicall(self):
+        return self.contract_at(self.addresses["multicall3_address"], "multicall3")
+
+    def faucet_address(self):
+        return self.address("contract_address")
+
+    def disperse(self):
+        return self.contract_at(self.addresses["disperse_address"], "disperse")
+
+    def set_address(self, key, address):
+        self.addresses[key] = address
+        filename = f"{self.abi_dir}/contracts.json"
+        with open(filename + ".tmp", mode="w", encoding="utf-8") as file:
+            json.dump(self.addresses, file, indent=4)
+        os.replace(filename + ".tmp", filename)
+
+    def log_stats(self):
+        log.info(
+            f"Contract registry: {self.hits} cache hits, "
+            f"{self.loads} ABI files loaded, {len(self._contracts)} contracts built"
+        )
+
+    def reset_stats(self):
+        self.hits = 0
+        self.loads = 0
+
+
+contracts = ContractRegistry("abi")
+
+
+class WalletRow:
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        if key == "address":
+            return self.table.address(self.index)
+        if key == "name":
+            return self.table.names[self.index]
+        if key == "private_key":
+            return self.table.private_keys[self.index]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class WalletTable:
+    __slots__ = ("names", "addresses", "private_keys", "_by_name", "_by_address")
+
+    def __init__(self):
+        self.names = []
+        self.addresses = []
+        self.private_keys = []
+        self._by_name = None
+        self._by_address = None
+
+    @classmethod
+    def read(cls, filename):
+        table = cls()
+        with open(filename, "r") as file:
+            for line in file:
+                table.append_line(line)
+        return table
+
+    @staticmethod
+    def parse_line(line):
+        # One rule for every reader, so --wallets numbers the same rows.
+        parts = line.strip().split(":")
+        if len(parts) == 3:
+            return parts[0], parts[1], parts[2]
+        if len(parts) == 1 and parts[0]:
+            return None, None, parts[0]
+        return None
+
+    def append_line(self, line):
+        row = self.parse_line(line)
+        if row is not None:
+            self.append(*row)
+
+    def append(self, name, address, private_key):
+        self.names.append(name)
+        self.addresses.append(Web3.to_checksum_address(address) if address else None)
+        self.private_keys.append(private_key)
+        self._by_name = None
+        self._by_address = None
+
+    def address(self, index):
+        address = self.addresses[index]
+        if address is None:
+            address = Account.from_key(self.private_keys[index]).address
+            self.addresses[index] = address
+        return address
+
+    def all_addresses(self):
+        return [self.address(index) for index in range(len(self))]
+
+    def by_name(self, name):
+        if self._by_name is None:
+            self._by_name = {
+                name: index for index, name in enumerate(self.names) if name is not None
+            }
+        index = self._by_name.get(name)
+        return None if index is None else self[index]
+
+    def by_address(self, address):
+        if self._by_address is None:
+            self._by_address = {
+                address.lower(): index
+                for index, address in enumerate(self.all_addresses())
+            }
+        index = self._by_address.get(address.lower())
+        return None if index is None else self[index]
+
+    def slice(self, start, stop=None):
+        table = WalletTable()
+        table.names = self.names[start:stop]
+        table.addresses = self.addresses[start:stop]
+        table.private_keys = self.private_keys[start:stop]
+        return table
+
+    def __len__(self):
+        return len(self.private_keys)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return WalletRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield WalletRow(self, index)
+
+
 class FileManager:
-    def __init__(self, filename):
+    def __init__(self, filename, wallet_range=None):
         self.filename = filename
+        # (start, stop) row slice applied to every wallet read, None for all
+        self.wallet_range = wallet_range
+        self._table = None
+        self._table_stamp = None
 
     def read_lines(self):
         lines = []
@@ -80,40 +949,644 @@ class FileManager:
         with open(self.filename, "w") as file:
             file.write("")
         file.close()
+        self._table = None
 
     def save_to_txt(self, name, address, private_key):
         with open(self.filename, "a") as file:
             file.write(f"{name}:{address}:{private_key}\n")
         file.close()
+        self._table = None
 
     def count_lines_in_file(self):
-        with open(self.filename, "r", encoding="UTF-8") as file:
-            return sum(1 for line in file)
+        with open(self.filename, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                return 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                lines = sum(
+                    chunk.count(b"\n")
+                    for chunk in iter(lambda: mapped.read(1 << 20), b"")
+                )
+                if mapped[size - 1 : size] != b"\n":
+                    lines += 1
+        return lines
 
-    def get_all_wallet_data_from_file(self):
-        wallet_data_list = []
-        with open(self.filename, "r") as file:
+    def _index_stamp(self):
+        stat = os.stat(self.filename)
+        return stat.st_size, stat.st_mtime_ns
+
+    def build_row_index(self):
+        offsets = array("Q")
+        with open(self.filename, "rb") as file:
+            offset = 0
             for line in file:
-                parts = line.strip().split(":")
-                if len(parts) == 3:
-                    wallet_data = {
-                        "name": parts[0],
-                        "address": parts[1],
-                        "private_key": parts[2],
-                    }
-                elif len(parts) == 1:
-                    wallet_data = {
-                        "name": None,
-                        "address": None,
-                        "private_key": parts[0],
-                    }
-                else:
+                if WalletTable.parse_line(line.decode("utf-8")) is not None:
+                    offsets.append(offset)
+                offset += len(line)
+
+        index_path = f"{self.filename}.rows.idx"
+        with open(f"{index_path}.tmp", "wb") as index_file:
+            index_file.write(struct.pack("<QQ", *self._index_stamp()))
+            offsets.tofile(index_file)
+        os.replace(f"{index_path}.tmp", index_path)
+
+    def row_offset(self, row_number):
+        for _ in range(2):
+            try:
+                with open(f"{self.filename}.rows.idx", "rb") as index_file:
+                    if struct.unpack("<QQ", index_file.read(16)) == self._index_stamp():
+                        index_file.seek(16 + 8 * row_number)
+                        data = index_file.read(8)
+                        return struct.unpack("<Q", data)[0] if len(data) == 8 else None
+            except (FileNotFoundError, struct.error):
+                pass
+            self.build_row_index()
+        return None
+
+    def iter_wallet_chunks(self, chunk_size=WALLET_CHUNK_SIZE, start_row=0):
+        stop_row = None
+        if self.wallet_range is not None:
+            start_row = max(start_row, self.wallet_range[0])
+            stop_row = self.wallet_range[1]
+        offset = self.row_offset(start_row) if start_row else 0
+        if offset is None:
+            return
+        chunk = WalletTable()
+        row_number = start_row
+        with open(self.filename, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                row = WalletTable.parse_line(line.decode("utf-8"))
+                if row is None:
                     continue
-                wallet_data_list.append(wallet_data)
-        return wallet_data_list
+                if stop_row is not None and row_number >= stop_row:
+                    break
+                chunk.append(*row)
+                row_number += 1
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = WalletTable()
+        if len(chunk):
+            yield chunk
+
+    def append_lines_atomic(self, line_chunks):
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, "w", buffering=1 << 20) as temp_file:
+            if os.path.exists(self.filename):
+                with open(self.filename, "r") as file:
+                    shutil.copyfileobj(file, temp_file)
+            for lines in line_chunks:
+                temp_file.write(lines)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_filename, self.filename)
+        if hasattr(os, "O_DIRECTORY"):
+            directory_fd = os.open(os.path.dirname(self.filename) or ".", os.O_DIRECTORY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+        self._table = None
+
+    def get_wallet_table(self):
+        stat = os.stat(self.filename)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self._table is None or self._table_stamp != stamp:
+            self._table = WalletTable.read(self.filename)
+            self._table_stamp = stamp
+        return self._table
 
+    def get_all_wallet_data_from_file(self):
+        table = self.get_wallet_table()
+        if self.wallet_range is not None:
+            return table.slice(*self.wallet_range)
+        return table
+
+
+
+
+class RpcBatch:
+    def __init__(self, chunk_size=RPC_BATCH_SIZE):
+        self.chunk_size = max(1, int(chunk_size))
+        self.batch_supported = True
+        self.max_batch = None  # learned from batches the node rate limited
+        self._next_id = 0
+
+    def execute(self, calls, chunk_size=None, raw=False):
+        # raw=True returns each JSON-RPC response item, errors included,
+        # instead of the bare result with None for errors.
+        chunk_size = max(1, int(chunk_size or self.chunk_size))
+        if self.max_batch:
+            chunk_size = min(chunk_size, self.max_batch)
+        results = []
+        for start in range(0, len(calls), chunk_size):
+            results.extend(self._execute_chunk(calls[start : start + chunk_size], raw))
+        return results
+
+    def _execute_chunk(self, chunk, raw):
+        if self.batch_supported and len(chunk) > 1:
+            error = None
+            for _ in range(RPC_BATCH_ATTEMPTS):
+                try:
+                    results = self._send_batch(chunk, raw)
+                except Exception as e:
+                    if rate_limit_delay(e) is not None:
+                        # Still throttled after the pool's retries: the batch
+                        # is likely bigger than the endpoint allows, so halve it.
+                        middle = len(chunk) // 2
+                        self.max_batch = min(self.max_batch or middle, middle)
+                        log.warning(f"RPC batch of {len(chunk)} rate limited, splitting it")
+                        return self._execute_chunk(chunk[:middle], raw) + self._execute_chunk(
+                            chunk[middle:], raw
+                        )
+                    error = e  # timeout or dropped connection, try again
+                    continue
+                if results is not None:
+                    return results
+                log.warning("RPC node does not support batches, falling back to single calls")
+                self.batch_supported = False
+                break
+            else:
+                # Batching stays on; only this chunk goes out as single calls.
+                log.warning(f"RPC batch failed, sending {len(chunk)} single calls: {error}")
+        return [self._send_single(method, params, raw) for method, params in chunk]
+
+    def _send_batch(self, chunk, raw=False):
+        payload = []
+        for method, params in chunk:
+            self._next_id += 1
+            payload.append(
+                {"jsonrpc": "2.0", "method": method, "params": params, "id": self._next_id}
+            )
+        request_data = json.dumps(payload).encode("utf-8")
+
+        if hasattr(web3.provider, "make_batch_request"):
+            response = web3.provider.make_batch_request(request_data, len(payload))
+        else:
+            endpoint_uri = getattr(web3.provider, "endpoint_uri", None)
+            if endpoint_uri is None:
+                return None  # no HTTP endpoint to post a batch to
+            response = json.loads(
+                make_post_request(
+                    endpoint_uri, request_data, **web3.provider.get_request_kwargs()
+                )
+            )
+        # A single object (usually a JSON-RPC error) instead of an array, or
+        # an array missing answers, means the node does not handle batches.
+        if not isinstance(response, list):
+            if rate_limit_delay(response) is not None:
+                raise ValueError(f"rate limited: {response.get('error')}")
+            return None
+        by_id = {item.get("id"): item for item in response if isinstance(item, dict)}
+        if any(request["id"] not in by_id for request in payload):
+            return None
+        results = []
+        for request in payload:
+            item = by_id[request["id"]]
+            if raw:
+                results.append(item)
+            else:
+                results.append(item.get("result") if "error" not in item else None)
+        return results
+
+    def _send_single(self, method, params, raw=False):
+        try:
+            response = web3.provider.make_request(method, params)
+        except Exception as e:
+            log.error(f"RPC call {method} failed: {e}")
+            return {"error": {"message": str(e)}} if raw else None
+        if raw:
+            return response
+        if "error" in response:
+            return None
+        return response.get("result")
+
+
+rpc_batch = RpcBatch(RPC_BATCH_SIZE)
+
+
+def eth_call_request(contract, fn_name, args, block="latest"):
+    data = contract.encodeABI(fn_name=fn_name, args=args)
+    return "eth_call", [{"to": contract.address, "data": data}, block]
+
+
+def decode_uint(result):
+    if result is None or result in ("0x", b""):
+        return None
+    if isinstance(result, (bytes, bytearray)):
+        return int.from_bytes(result, "big")
+    return int(result, 16)
 
 
+def batch_eth_call(requests, chunk_size=None):
+    return [decode_uint(result) for result in rpc_batch.execute(requests, chunk_size)]
+
+
+def batch_transaction_receipts(tx_hashes, chunk_size=None):
+    return rpc_batch.execute(
+        [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes], chunk_size
+    )
+
+
+def decode_revert(error):
+    """Revert reason from a JSON-RPC error, None when it is not a revert."""
+    message = str(error.get("message", ""))
+    data = error.get("data")
+    if isinstance(data, dict):
+        data = data.get("data")
+    if error.get("code") != 3 and "revert" not in message.lower():
+        return None
+    if not isinstance(data, str) or len(data) < 10:
+        return message or "execution reverted"
+    payload = bytes.fromhex(data[10:])
+    try:
+        if data[:10] == "0x08c379a0":  # Error(string)
+            return abi_decode(["string"], payload)[0]
+        if data[:10] == "0x4e487b71":  # Panic(uint256)
+            return f"panic 0x{abi_decode(['uint256'], payload)[0]:02x}"
+    except Exception:
+        pass
+    return f"custom error {data[:10]}"
+
+
+def simulate_transactions(transactions, block="pending", chunk_size=None):
+    calls = []
+    for my_tx in transactions:
+        call = {"to": my_tx["to"], "value": hex(my_tx.get("value", 0))}
+        if my_tx.get("from"):
+            call["from"] = my_tx["from"]
+        if my_tx.get("data"):
+            call["data"] = my_tx["data"]
+        calls.append(("eth_call", [call, block]))
+    return [
+        decode_revert(item["error"]) if item and "error" in item else None
+        for item in rpc_batch.execute(calls, chunk_size, raw=True)
+    ]
+
+
+class Multicall:
+    def __init__(self, chunk_size=MULTICALL_BATCH_SIZE):
+        self.chunk_size = max(1, int(chunk_size))
+        self.available = None
+
+    def is_available(self):
+        if self.available is None:
+            try:
+                code = web3.eth.get_code(contracts.multicall().address)
+                self.available = len(code) > 0
+            except Exception as e:
+                log.warning(f"Multicall3 check failed: {e}")
+                self.available = False
+            if not self.available:
+                log.error(
+                    f"No Multicall3 code at {contracts.address('multicall3_address')}, "
+                    "check multicall3_address in abi/contracts.json; using RPC batches"
+                )
+        return self.available
+
+    def aggregate(self, calls):
+        multicall = contracts.multicall()
+        requests = []
+        for start in range(0, len(calls), self.chunk_size):
+            call3 = [
+                (contract.address, True, contract.encodeABI(fn_name=fn_name, args=args))
+                for contract, fn_name, args in calls[start : start + self.chunk_size]
+            ]
+            requests.append(eth_call_request(multicall, "aggregate3", [call3]))
+
+        results = []
+        for start, raw_result in zip(
+            range(0, len(calls), self.chunk_size), rpc_batch.execute(requests)
+        ):
+            chunk_length = min(self.chunk_size, len(calls) - start)
+            if raw_result is None:
+                results.extend([None] * chunk_length)
+                continue
+            (return_data,) = web3.codec.decode(
+                ["(bool,bytes)[]"], bytes.fromhex(raw_result[2:])
+            )
+            for success, data in return_data:
+                results.append(decode_uint(bytes(data)) if success else None)
+        return results
+
+
+multicall = Multicall(MULTICALL_BATCH_SIZE)
+
+
+def read_contract_calls(calls):
+    if USE_MULTICALL and len(calls) > 1 and multicall.is_available():
+        return multicall.aggregate(calls)
+    return batch_eth_call(
+        [eth_call_request(contract, fn_name, args) for contract, fn_name, args in calls]
+    )
+
+
+def batch_token_balances(addresses):
+    token = contracts.token()
+    return read_contract_calls(
+        [(token, "balanceOf", [address]) for address in addresses]
+    )
+
+
+def batch_pending_rewards(addresses):
+    stake_contract = contracts.stake_contract()
+    return read_contract_calls(
+        [(stake_contract, "pendingUserReward", [address]) for address in addresses]
+    )
+
+
+def address_topic(address):
+    return "0x" + "00" * 12 + address.lower()[2:]
+
+
+def fetch_logs(log_filter, from_block, to_block, chunk=LOG_CHUNK_BLOCKS):
+    # Providers cap eth_getLogs by range or result count; halve the range
+    # when a request is rejected and grow it back while results stay small.
+    start = from_block
+    while start <= to_block:
+        end = min(to_block, start + chunk - 1)
+        try:
+            logs = web3.eth.get_logs({**log_filter, "fromBlock": start, "toBlock": end})
+        except Exception as e:
+            if chunk == 1:
+                raise
+            chunk = max(1, chunk // 2)
+            log.warning(f"eth_getLogs {start}-{end} rejected ({e}), retrying with {chunk} blocks")
+            continue
+        yield start, end, logs
+        start = end + 1
+        if len(logs) < LOG_CHUNK_GROW_BELOW:
+            chunk = min(LOG_CHUNK_BLOCKS, chunk * 2)
+
+
+class AllowanceCache:
+    """Known token allowances, kept current from Approval and Transfer logs.
+
+    Entries are set when an allowance is read or an approve is mined, and
+    moved forward by one eth_getLogs scan per run over the blocks since the
+    last sync. Transfers pulled by the spender lower the allowance unless
+    the same transaction also emitted an Approval with the new value.
+    """
+
+    APPROVAL_TOPIC = Web3.to_hex(Web3.keccak(text="Approval(address,address,uint256)"))
+    TRANSFER_TOPIC = Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)"))
+    UNLIMITED = 2**256 - 1
+
+    def __init__(self, filename=ALLOWANCE_CACHE_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.synced = {}
+        self.allowances = {}
+        self.skipped = 0
+        if os.path.exists(filename):
+            try:
+                with open(filename, "r", encoding="utf-8") as file:
+                    data = json.load(file)
+                self.synced = data["synced"]
+                self.allowances = {key: int(value) for key, value in data["allowances"].items()}
+            except (ValueError, KeyError) as e:
+                log.warning(f"Ignoring unreadable allowance cache {filename}: {e}")
+
+    @staticmethod
+    def key(token, owner, spender):
+        return f"{token}:{owner}:{spender}".lower()
+
+    def get(self, token, owner, spender):
+        with self.lock:
+            return self.allowances.get(self.key(token, owner, spender))
+
+    def set(self, token, owner, spender, amount):
+        with self.lock:
+            self.allowances[self.key(token, owner, spender)] = int(amount)
+
+    def invalidate(self, token, owner, spender):
+        with self.lock:
+            self.allowances.pop(self.key(token, owner, spender), None)
+
+    def is_sufficient(self, token, owner, spender, amount):
+        allowance = self.get(token, owner, spender)
+        if allowance is not None and amount is not None and allowance >= amount:
+            self.skipped += 1
+            return True
+        return False
+
+    def sync(self, token, spender):
+        pair = f"{token}:{spender}".lower()
+        head = web3.eth.block_number
+        last = self.synced.get(pair)
+        if last is None or head - last > ALLOWANCE_RESYNC_BLOCKS:
+            prefix, suffix = f"{token}:".lower(), f":{spender}".lower()
+            with self.lock:
+                for key in list(self.allowances):
+                    if key.startswith(prefix) and key.endswith(suffix):
+                        del self.allowances[key]
+            self.synced[pair] = head
+            return
+        log_filter = {
+            "address": token,
+            "topics": [[self.APPROVAL_TOPIC, self.TRANSFER_TOPIC], None, address_topic(spender)],
+        }
+        for _, _, logs in fetch_logs(log_filter, last + 1, head):
+            self._apply_logs(token, spender, logs)
+        self.synced[pair] = head
+
+    def _apply_logs(self, token, spender, logs):
+        approved = {
+            (entry["transactionHash"], entry["topics"][1])
+            for entry in logs
+            if Web3.to_hex(entry["topics"][0]) == self.APPROVAL_TOPIC
+        }
+        with self.lock:
+            for entry in logs:
+                owner = "0x" + Web3.to_hex(entry["topics"][1])[-40:]
+                key = self.key(token, owner, spender)
+                value = int(Web3.to_hex(entry["data"]), 16)
+                if Web3.to_hex(entry["topics"][0]) == self.APPROVAL_TOPIC:
+                    self.allowances[key] = value
+                elif (entry["transactionHash"], entry["topics"][1]) in approved:
+                    continue
+                elif key in self.allowances and self.allowances[key] != self.UNLIMITED:
+                    self.allowances[key] = max(0, self.allowances[key] - value)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        temp_filename = f"{self.filename}.tmp"
+        with self.lock:
+            data = {
+                "synced": self.synced,
+                "allowances": {key: str(value) for key, value in self.allowances.items()},
+            }
+        with open(temp_filename, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(temp_filename, self.filename)
+
+    def log_stats(self):
+        if self.skipped:
+            log.info(f"Allowance cache: {self.skipped} approvals known to be sufficient")
+
+    def reset_stats(self):
+        self.skipped = 0
+
+
+allowance_cache = AllowanceCache()
+
+
+class EventIndexer:
+    """Token Transfer history in SQLite, fetched incrementally from a checkpoint.
+
+    Balances are a snapshot read at the block a wallet started being tracked
+    plus the indexed transfers after it. Transfers into the stake contract
+    are stakes and transfers out of it are claimed rewards.
+    """
+
+    TRANSFER_TOPIC = AllowanceCache.TRANSFER_TOPIC
+
+    def __init__(self, filename=EVENT_INDEX_DB):
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        self.db = sqlite3.connect(filename, check_same_thread=False)
+        self.db.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS checkpoint (
+                contract TEXT PRIMARY KEY, block INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS transfers (
+                block INTEGER NOT NULL,
+                log_index INTEGER NOT NULL,
+                tx_hash TEXT NOT NULL,
+                sender TEXT NOT NULL,
+                recipient TEXT NOT NULL,
+                amount TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                PRIMARY KEY (block, log_index)
+            );
+            CREATE INDEX IF NOT EXISTS transfers_sender ON transfers (sender, block);
+            CREATE INDEX IF NOT EXISTS transfers_recipient ON transfers (recipient, block);
+            CREATE TABLE IF NOT EXISTS snapshots (
+                address TEXT PRIMARY KEY, balance TEXT NOT NULL, block INTEGER NOT NULL
+            );
+            """
+        )
+        self.token = contracts.address("nulink_token_address").lower()
+        self.stake = contracts.address("stake_contract_address").lower()
+
+    def checkpoint(self):
+        row = self.db.execute(
+            "SELECT block FROM checkpoint WHERE contract = ?", (self.token,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def update(self):
+        head = web3.eth.block_number
+        last = self.checkpoint()
+        if last is None:
+            # Nothing before the first run is fetched; wallets are
+            # snapshotted at this block instead.
+            self._set_checkpoint(head)
+            self.db.commit()
+            return 0
+        fetched = 0
+        log_filter = {"address": Web3.to_checksum_address(self.token), "topics": [self.TRANSFER_TOPIC]}
+        for _, end, logs in fetch_logs(log_filter, last + 1, head):
+            self.db.executemany(
+                "INSERT OR IGNORE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._transfer_row(entry) for entry in logs],
+            )
+            self._set_checkpoint(end)
+            self.db.commit()
+            fetched += len(logs)
+        return fetched
+
+    def _set_checkpoint(self, block):
+        self.db.execute(
+            "INSERT OR REPLACE INTO checkpoint VALUES (?, ?)", (self.token, block)
+        )
+
+    def _transfer_row(self, entry):
+        sender = "0x" + Web3.to_hex(entry["topics"][1])[-40:]
+        recipient = "0x" + Web3.to_hex(entry["topics"][2])[-40:]
+        if recipient == self.stake:
+            kind = "stake"
+        elif sender == self.stake:
+            kind = "reward"
+        else:
+            kind = "transfer"
+        return (
+            entry["blockNumber"],
+            entry["logIndex"],
+            Web3.to_hex(entry["transactionHash"]),
+            sender,
+            recipient,
+            str(int(Web3.to_hex(entry["data"]), 16)),
+            kind,
+        )
+
+    def track(self, addresses):
+        known = {row[0] for row in self.db.execute("SELECT address FROM snapshots")}
+        new = [address for address in addresses if address.lower() not in known]
+        if not new:
+            return 0
+        block = self.checkpoint()
+        token = contracts.token()
+        balances = batch_eth_call(
+            [eth_call_request(token, "balanceOf", [address], hex(block)) for address in new]
+        )
+        self.db.executemany(
+            "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+            [
+                (address.lower(), str(balance), block)
+                for address, balance in zip(new, balances)
+                if balance is not None
+            ],
+        )
+        self.db.commit()
+        return len(new)
+
+    def summary(self, address):
+        address = address.lower()
+        row = self.db.execute(
+            "SELECT balance, block FROM snapshots WHERE address = ?", (address,)
+        ).fetchone()
+        if row is None:
+            return None
+        balance, since = int(row[0]), row[1]
+        staked = claimed = 0
+        last_block = None
+        for block, _, sender, recipient, amount, kind in self.history(address):
+            amount = int(amount)
+            if block > since:
+                balance += amount if recipient == address else -amount
+            if kind == "stake" and sender == address:
+                staked += amount
+            elif kind == "reward" and recipient == address:
+                claimed += amount
+            last_block = block
+        return {
+            "balance": balance,
+            "staked": staked,
+            "claimed": claimed,
+            "last_block": last_block,
+        }
+
+    def history(self, address):
+        address = address.lower()
+        return self.db.execute(
+            "SELECT block, tx_hash, sender, recipient, amount, kind FROM transfers "
+            "WHERE sender = ? OR recipient = ? ORDER BY block, log_index",
+            (address, address),
+        ).fetchall()
+
+
+@functools.lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def address_of(private_key):
+    return Account.from_key(private_key).address
+
+
+def wallet_addresses_from(wallet_data):
+    if isinstance(wallet_data, WalletTable):
+        return wallet_data.all_addresses()
+    return [address_of(wallet["private_key"]) for wallet in wallet_data]
+
 
 def create_new_ethereum_wallet(name):
     new_account = Account.create()
@@ -122,26 +1595,363 @@ def create_new_ethereum_wallet(name):
     return name, address, private_key
 
 
+def _generate_wallets_worker(job):
+    first_index, count = job
+    lines = []
+    for i in range(first_index, first_index + count):
+        name, address, private_key = create_new_ethereum_wallet(f"{i}")
+        lines.append(f"{name}:{address}:{private_key}\n")
+    return "".join(lines)
+
+
+def generate_wallet_lines(first_index, count, workers=SIGN_WORKERS):
+    jobs = [
+        (start, min(KEYGEN_CHUNK_SIZE, first_index + count - start))
+        for start in range(first_index, first_index + count, KEYGEN_CHUNK_SIZE)
+    ]
+    if workers <= 1 or count < KEYGEN_PARALLEL_MIN:
+        yield from map(_generate_wallets_worker, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_generate_wallets_worker, jobs)
+
+
 def random_time(min, max):
     return random.randint(min, max)
 
 
-def sign_and_send_transaction(transfer_tx, private_key):
-    try:
+class GasOracle:
+    def __init__(
+        self,
+        ttl=GAS_PRICE_TTL,
+        percentile=GAS_PRICE_PERCENTILE,
+        bump=GAS_PRICE_BUMP,
+    ):
+        self.ttl = ttl
+        self.percentile = percentile
+        self.bump = bump
+        self.lock = threading.Lock()
+        self._chain_id = None
+        self._fees = None
+        self._fetched_at = 0.0
+
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = web3.eth.chain_id
+        return self._chain_id
+
+    def _percentile_reward(self):
+        if self.percentile is None:
+            return None
+        try:
+            history = web3.eth.fee_history(5, "latest", [self.percentile])
+            rewards = sorted(reward[0] for reward in history["reward"] if reward)
+        except Exception as e:
+            log.warning(f"fee_history unavailable, ignoring gas percentile: {e}")
+            self.percentile = None
+            return None
+        return rewards[len(rewards) // 2] if rewards else None
+
+    def _refresh(self):
+        base_fee = None
+        if USE_EIP1559:
+            base_fee = web3.eth.get_block("latest").get("baseFeePerGas")
+        reward = self._percentile_reward()
+
+        if base_fee:
+            priority_fee = reward if reward is not None else web3.eth.max_priority_fee
+            priority_fee = int(priority_fee * self.bump)
+            return {
+                "maxFeePerGas": int(2 * base_fee * self.bump) + priority_fee,
+                "maxPriorityFeePerGas": priority_fee,
+            }
+
+        gas_price = web3.eth.gas_price
+        if reward is not None:
+            gas_price = max(gas_price, reward)
+        return {"gasPrice": int(gas_price * self.bump)}
+
+    def fee_fields(self):
+        with self.lock:
+            if self._fees is None or time.monotonic() - self._fetched_at > self.ttl:
+                self._fees = self._refresh()
+                self._fetched_at = time.monotonic()
+            return dict(self._fees)
+
+    def invalidate(self):
+        with self.lock:
+            self._fees = None
+
+    def apply(self, my_tx):
+        fees = self.fee_fields()
+        if "gasPrice" not in fees:
+            my_tx.pop("gasPrice", None)
+        my_tx.update(fees)
+        my_tx["chainId"] = self.chain_id
+        return my_tx
+
+
+gas_oracle = GasOracle()
+
+
+class GasLimitCache:
+    def __init__(self, warmup=GAS_WARMUP_SAMPLES, margin=GAS_LIMIT_MARGIN):
+        self.warmup = max(1, int(warmup))
+        self.margin = margin
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.hits = 0
+        self.estimates = 0
+
+    @staticmethod
+    def key(my_tx):
+        data = my_tx.get("data") or "0x"
+        if isinstance(data, (bytes, bytearray)):
+            data = "0x" + bytes(data).hex()
+        if data == "0x":
+            # Plain value transfers cost the same for every EOA recipient.
+            return (None, "0x")
+        return (str(my_tx.get("to")).lower(), data[:10].lower())
+
+    def get(self, my_tx):
+        with self.lock:
+            samples = self.samples.get(self.key(my_tx))
+            if samples is None or len(samples) < self.warmup:
+                return None
+            self.hits += 1
+            return int(max(samples) * self.margin)
+
+    def record(self, my_tx, estimate):
+        with self.lock:
+            self.estimates += 1
+            samples = self.samples.setdefault(self.key(my_tx), [])
+            samples.append(estimate)
+            del samples[: -self.warmup]
+
+    def invalidate(self, key):
+        with self.lock:
+            if self.samples.pop(key, None) is not None:
+                log.warning(f"Gas limit for {key[0]} {key[1]} will be re-estimated")
+
+    def estimate(self, my_tx):
+        gas_limit = self.get(my_tx)
+        if gas_limit is not None:
+            return gas_limit
+        # The nonce does not change the cost, and pre-reserved future nonces
+        # would be rejected by nodes that validate it during estimation.
+        estimate = web3.eth.estimate_gas(
+            {key: value for key, value in my_tx.items() if key != "nonce"}
+        )
+        if estimate <= 0:
+            raise ValueError("Gas estimation failed or returned non-positive value")
+        self.record(my_tx, estimate)
+        return int(estimate * self.margin)
+
+    def log_stats(self):
+        log.info(
+            f"Gas limit cache: {self.hits} reused, {self.estimates} estimated"
+        )
+
+    def reset_stats(self):
+        self.hits = 0
+        self.estimates = 0
+
+
+gas_limits = GasLimitCache()
+
+
+class NonceManager:
+    NONCE_TOO_LOW = (
+        "nonce too low",
+        "nonce is too low",
+        "invalid nonce",
+        "invalid transaction nonce",
+    )
+    ALREADY_KNOWN = ("already known", "known transaction", "already imported")
+    UNDERPRICED = ("underpriced", "fee too low", "less than block base fee")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.locks = {}
+        self.next_nonce = {}
+        self.gaps = {}
+        self.reserved = {}
+        self.accepted = {}
+
+    def _lock(self, address):
+        with self.lock:
+            return self.locks.setdefault(address, threading.Lock())
+
+    def _sync(self, address):
+        # Read from the endpoint transactions are sent to; another one may
+        # not have seen the latest of them yet.
+        pending = int(
+            web3.provider.pool.request_sender(
+                "eth_getTransactionCount", [address, "pending"]
+            ),
+            16,
+        )
+        local_nonce = self.next_nonce.get(address, pending)
+        gaps = {nonce for nonce in self.gaps.get(address, ()) if nonce >= pending}
+        accepted = {nonce for nonce in self.accepted.get(address, ()) if nonce >= pending}
+        # The node has nothing at its pending nonce although it was handed
+        # out, is not being sent right now and was not accepted by the node
+        # (or its receipt timed out): that transaction was dropped.
+        if (
+            pending < local_nonce
+            and pending not in self.reserved.get(address, ())
+            and pending not in accepted
+        ):
+            gaps.add(pending)
+        self.next_nonce[address] = max(pending, local_nonce)
+        self.gaps[address] = gaps
+        self.accepted[address] = accepted
+        self.reserved.setdefault(address, set())
+        return pending
+
+    def reserve(self, address):
+        address = Web3.to_checksum_address(address)
+        with self._lock(address):
+            if address not in self.next_nonce:
+                self._sync(address)
+            if self.gaps[address]:
+                nonce = min(self.gaps[address])
+                self.gaps[address].discard(nonce)
+            else:
+                nonce = self.next_nonce[address]
+                self.next_nonce[address] += 1
+            self.reserved[address].add(nonce)
+            return nonce
+
+    def accept(self, address, nonce):
+        address = Web3.to_checksum_address(address)
+        with self._lock(address):
+            if address in self.next_nonce:
+                self.reserved[address].discard(nonce)
+                self.gaps[address].discard(nonce)
+                self.accepted[address].add(nonce)
+                self.next_nonce[address] = max(self.next_nonce[address], nonce + 1)
+
+    def release(self, address, nonce):
+        address = Web3.to_checksum_address(address)
+        with self._lock(address):
+            if address not in self.next_nonce:
+                return
+            self.reserved[address].discard(nonce)
+            if nonce >= self.next_nonce[address]:
+                return
+            if nonce == self.next_nonce[address] - 1:
+                self.next_nonce[address] -= 1
+                while self.next_nonce[address] - 1 in self.gaps[address]:
+                    self.next_nonce[address] -= 1
+                    self.gaps[address].discard(self.next_nonce[address])
+            else:
+                self.gaps[address].add(nonce)
+                log.warning(f"Nonce gap at {nonce} for {address}")
+
+    def resync(self, address, timed_out=None):
+        """Checks the local nonces against the node after a failed or
+        unconfirmed send, so a dropped transaction is sent again instead of
+        holding up every later one from the same sender. timed_out is the
+        nonce of a transaction whose receipt never arrived."""
+        address = Web3.to_checksum_address(address)
+        with self._lock(address):
+            local_nonce = self.next_nonce.get(address)
+            if timed_out is not None:
+                self.accepted.get(address, set()).discard(timed_out)
+            try:
+                pending = self._sync(address)
+            except Exception as e:
+                log.warning(f"Nonce resync for {address} failed: {e}")
+                return
+            log.warning(
+                f"Nonce resync for {address}: local {local_nonce}, pending {pending}"
+            )
+
+    def classify_error(self, error):
+        message = str(error).lower()
+        if any(text in message for text in self.ALREADY_KNOWN):
+            return "known"
+        if any(text in message for text in self.NONCE_TOO_LOW):
+            return "too_low"
+        if any(text in message for text in self.UNDERPRICED):
+            return "underpriced"
+        return None
+
+    def fill_gaps(self, address, private_key):
+        address = Web3.to_checksum_address(address)
+        with self._lock(address):
+            gaps = sorted(self.gaps.get(address, ()))
+            self.gaps[address] = set()
+        for nonce in gaps:
+            log.warning(f"Filling nonce gap {nonce} for {address}")
+            filler_tx = {
+                "to": address,
+                "value": 0,
+                "gas": 21000,
+                "gasPrice": 0,
+                "nonce": nonce,
+                "chainId": gas_oracle.chain_id,
+            }
+            # A filler that is too low means the nonce was used after all.
+            broadcast_transaction(filler_tx, private_key, renew_nonce=False)
+
+
+nonce_manager = NonceManager()
+
+
+def broadcast_transaction(transfer_tx, private_key, renew_nonce=True):
+    sender_address = address_of(private_key)
+    for attempt in range(2):
         signed_tx = sign_my_tx(transfer_tx, private_key)
-        if signed_tx is not None:
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            log.info(f"Transaction sent. Hash: {tx_hash.hex()}")
-            
-            tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+        if signed_tx is None:
+            log.error("Transaction signing failed.")
+            nonce_manager.release(sender_address, transfer_tx["nonce"])
+            return None
+        try:
+            with metrics.timer("send"):
+                tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as e:
+            error = nonce_manager.classify_error(e)
+            if error == "known":
+                nonce_manager.accept(sender_address, transfer_tx["nonce"])
+                return signed_tx.hash
+            if error == "underpriced":
+                gas_oracle.invalidate()  # the next send fetches fees again
+            nonce_manager.release(sender_address, transfer_tx["nonce"])
+            nonce_manager.resync(sender_address)
+            if error == "too_low" and attempt == 0 and renew_nonce:
+                transfer_tx["nonce"] = nonce_manager.reserve(sender_address)
+                continue
+            log.error(f"Error sending transaction: {e}")
+            return None
+        nonce_manager.accept(sender_address, transfer_tx["nonce"])
+        log.info(f"Transaction sent. Hash: {tx_hash.hex()}")
+        return tx_hash
+    return None
+
+
+def sign_and_send_transaction(transfer_tx, private_key, pipeline=None, label=None):
+    if pipeline is not None:
+        return pipeline.submit(transfer_tx, private_key, label)
+    try:
+        tx_hash = broadcast_transaction(transfer_tx, private_key)
+        if tx_hash is not None:
+            try:
+                with metrics.timer("confirm"):
+                    tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            except Exception:
+                nonce_manager.resync(address_of(private_key), transfer_tx["nonce"])
+                raise
             if tx_receipt.status == 1:
                 log.info("Transaction successful.")
                 return True
             else:
                 log.error("Transaction failed. Reverted.")
+                gas_limits.invalidate(gas_limits.key(transfer_tx))
                 return False
         else:
-            log.error("Transaction signing failed.")
             return False
     except ValueError as e:
         log.error(f"Error signing or sending transaction: {e}")
@@ -151,24 +1961,55 @@ def sign_and_send_transaction(transfer_tx, private_key):
         return False
 
 
+@metrics.timer("build")
+def prepare_transaction(my_tx):
+    fees = gas_oracle.fee_fields()
+    gas_limit = my_tx.get("gas")
+
+    if gas_limit is None or gas_limit <= 0:
+        gas_limit = gas_limits.estimate(my_tx)
+
+    if fees.get("gasPrice", fees.get("maxFeePerGas", 0)) <= 0:
+        raise ValueError("Invalid gasPrice value")
+
+    my_tx["gas"] = gas_limit
+    return gas_oracle.apply(my_tx)
+
+
+def _sign_worker(job):
+    my_tx, private_key = job
+    try:
+        signed_tx = Account.sign_transaction(my_tx, private_key)
+    except Exception as e:
+        return None, str(e)
+    return bytes(signed_tx.rawTransaction), bytes(signed_tx.hash)
+
+
+def start_sign_pool(expected_jobs, workers=SIGN_WORKERS):
+    # Started once per run, before its sender and receipt threads: a child
+    # forked from a process with busy threads can hang on a copied lock.
+    if workers <= 1 or expected_jobs < SIGN_PARALLEL_MIN:
+        return None
+    executor = ProcessPoolExecutor(max_workers=workers)
+    executor.submit(int).result()  # fork the workers now
+    return executor
+
+
+@metrics.timer("sign_batch")
+def sign_transactions(jobs, executor=None, workers=SIGN_WORKERS):
+    if executor is None or len(jobs) < SIGN_PARALLEL_MIN:
+        return [_sign_worker(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    return list(executor.map(_sign_worker, jobs, chunksize=chunksize))
+
+
 def sign_my_tx(my_tx, private_key):
     try:
-        gas_price = web3.eth.gas_price
-        gas_limit = my_tx.get("gas")
-        
-        if gas_limit is None or gas_limit <= 0:
-            gas_limit = web3.eth.estimate_gas(my_tx)
-            if gas_limit <= 0:
-                raise ValueError("Gas estimation failed or returned non-positive value")
-            gas_limit = int(gas_limit * 1.1)
-            
-        if gas_price <= 0:
-            raise ValueError("Invalid gasPrice value")
-        
-        my_tx["gas"] = gas_limit
-        my_tx["gasPrice"] = gas_price
-        
-        signed_transaction = web3.eth.account.sign_transaction(my_tx, private_key=private_key)
+        prepare_transaction(my_tx)
+        with metrics.timer("sign"):
+            signed_transaction = web3.eth.account.sign_transaction(
+                my_tx, private_key=private_key
+            )
         return signed_transaction
     except ValueError as e:
         log.error(f"Error signing transaction: {e}")
@@ -179,19 +2020,625 @@ def sign_my_tx(my_tx, private_key):
 
 
 
-def send_bnb(private_key, address_to, amount, nonce):
-    #nonce = web3.eth.get_transaction_count(Web3.to_checksum_address(Account.from_key(private_key).address))
-    nonce = nonce
-    transfer_tx = {
+class RunJournal:
+    IN_FLIGHT = ("sent", "timeout")
+    SETTLED = ("success", "reverted", "dropped")
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.state = {}
+        if os.path.exists(filename):
+            with open(filename, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    self.state[(record["wallet"], record["step"])] = record
+            if self.state:
+                log.warning(
+                    f"Resuming from journal {filename}: {len(self.state)} entries"
+                )
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        self.file = open(filename, "a", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_operation(cls, operation, file_manager=None):
+        name = operation
+        if file_manager is not None:
+            name += "-" + os.path.splitext(os.path.basename(file_manager.filename))[0]
+        return cls(f"{JOURNAL_DIR}/{name}.jsonl")
+
+    def record(self, wallet, step, status, tx_hash=None):
+        record = {
+            "wallet": wallet,
+            "step": step,
+            "status": status,
+            "tx_hash": tx_hash,
+            "time": int(time.time()),
+        }
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.state[(wallet, step)] = record
+
+    def status(self, wallet, step):
+        record = self.state.get((wallet, step))
+        return record["status"] if record else None
+
+    def is_done(self, wallet, step):
+        return self.status(wallet, step) in ("success",) + self.IN_FLIGHT
+
+    def resume_in_flight(self):
+        in_flight = self.unsettled()
+        if not in_flight:
+            return
+        log.info(f"Waiting for {len(in_flight)} in-flight transactions from last run")
+        statuses = transaction_statuses(
+            list({record["tx_hash"] for record in in_flight if record["tx_hash"]})
+        )
+        for record in in_flight:
+            self.record(
+                record["wallet"],
+                record["step"],
+                statuses.get(record["tx_hash"], "dropped"),
+                record["tx_hash"],
+            )
+
+    def unsettled(self):
+        # A hash that was sent but never seen mined or dropped may still land,
+        # so it is kept for the next run instead of being sent again.
+        return [
+            record
+            for record in self.state.values()
+            if record["status"] in self.IN_FLIGHT
+            or (record["tx_hash"] and record["status"] not in self.SETTLED)
+        ]
+
+    def complete(self):
+        # Only the unconfirmed transactions are kept: the next run checks
+        # them before sending, and does everything else again.
+        self.file.close()
+        unsettled = self.unsettled()
+        if not unsettled:
+            os.remove(self.filename)
+            return
+        with open(self.filename + ".tmp", "w", encoding="utf-8") as file:
+            for record in unsettled:
+                file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(self.filename + ".tmp", self.filename)
+        log.warning(
+            f"Keeping journal {self.filename}: {len(unsettled)} transactions "
+            "are not confirmed yet, the next run checks them before sending"
+        )
+
+
+class GroupJournal:
+    """Journals a transaction sent for several wallets once per wallet."""
+
+    def __init__(self, journal):
+        self.journal = journal
+        self.groups = {}
+
+    def record(self, label, step, status, tx_hash=None):
+        for wallet in self.groups.get(label, (label,)):
+            self.journal.record(wallet, step, status, tx_hash)
+
+
+def transaction_statuses(tx_hashes, timeout=RECEIPT_TIMEOUT):
+    # Journaled hashes have no 0x prefix; the raw calls below need it.
+    prefixed = {Web3.to_hex(hexstr=tx_hash): tx_hash for tx_hash in tx_hashes}
+    statuses = {}
+    futures = {}
+    for tx_hash, receipt in zip(prefixed, batch_transaction_receipts(list(prefixed))):
+        if receipt is None:
+            futures[tx_hash] = receipt_tracker.track(HexBytes(tx_hash))
+        else:
+            statuses[tx_hash] = "success" if int(receipt["status"], 16) == 1 else "reverted"
+    deadline = time.monotonic() + timeout
+    for tx_hash, future in futures.items():
+        try:
+            receipt = future.result(timeout=max(0, deadline - time.monotonic()))
+            statuses[tx_hash] = "success" if receipt.status == 1 else "reverted"
+        except Exception:
+            receipt_tracker.forget(HexBytes(tx_hash))
+    missing = [tx_hash for tx_hash in prefixed if tx_hash not in statuses]
+    known = rpc_batch.execute([("eth_getTransactionByHash", [tx_hash]) for tx_hash in missing])
+    for tx_hash, transaction in zip(missing, known):
+        # Still pending means do not send it again.
+        statuses[tx_hash] = "dropped" if transaction is None else "timeout"
+    return {prefixed[tx_hash]: status for tx_hash, status in statuses.items()}
+
+
+class ReceiptTracker:
+    """Confirms transactions by following new blocks.
+
+    One eth_blockNumber poll per interval and one block fetch per new block
+    replace a polling loop per transaction; receipts are only requested for
+    blocks that contain a tracked hash.
+    """
+
+    def __init__(self, poll_interval=BLOCK_POLL_INTERVAL, recheck_after=RECEIPT_RECHECK_AFTER):
+        self.poll_interval = poll_interval
+        self.recheck_after = recheck_after
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.last_block = None
+        self.last_recheck = 0
+        self.block_receipts_supported = True
+        self.scanned = deque(maxlen=SCANNED_BLOCKS_KEPT)
+        self.missed = set()
+
+    def track(self, tx_hash):
+        future = Future()
+        tx_hash = Web3.to_hex(tx_hash)
+        with self.lock:
+            self.pending[tx_hash] = (future, time.monotonic())
+            # Mined in a block that was scanned before the hash was tracked.
+            if any(tx_hash in hashes for hashes in self.scanned):
+                self.missed.add(tx_hash)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        return future
+
+    def forget(self, tx_hash):
+        with self.lock:
+            self.pending.pop(Web3.to_hex(tx_hash), None)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    self.last_block = None
+                    self.scanned.clear()
+                    return
+            try:
+                self._poll()
+            except Exception as e:
+                log.warning(f"Block poll failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def _poll(self):
+        with self.lock:
+            missed, self.missed = self.missed, set()
+        if missed:
+            self._resolve(batch_transaction_receipts(list(missed)))
+        head = web3.eth.block_number
+        if self.last_block is None:
+            # Anything mined before the tracker started is looked up by hash.
+            self.last_block = head
+            self._recheck(0)
+            return
+        while self.last_block < head:
+            block = web3.eth.get_block(self.last_block + 1)
+            hashes = {Web3.to_hex(tx_hash) for tx_hash in block["transactions"]}
+            with self.lock:
+                self.scanned.append(hashes)
+                matched = hashes & self.pending.keys()
+            if matched:
+                self._resolve(self._block_receipts(block["number"], matched))
+            self.last_block = block["number"]
+        self._recheck(self.recheck_after)
+
+    def _recheck(self, age):
+        # A hash tracked just after its block was scanned never matches a
+        # later block, so old entries are fetched by hash now and then.
+        now = time.monotonic()
+        if age and now - self.last_recheck < age:
+            return
+        self.last_recheck = now
+        with self.lock:
+            stale = [
+                tx_hash
+                for tx_hash, (_, tracked_at) in self.pending.items()
+                if now - tracked_at >= age
+            ]
+        if stale:
+            self._resolve(batch_transaction_receipts(stale))
+
+    def _block_receipts(self, block_number, matched):
+        if self.block_receipts_supported:
+            response = web3.provider.make_request("eth_getBlockReceipts", [hex(block_number)])
+            if "error" not in response and response.get("result") is not None:
+                return response["result"]
+            log.info("eth_getBlockReceipts unavailable, fetching receipts by hash")
+            self.block_receipts_supported = False
+        return batch_transaction_receipts(matched)
+
+    def _resolve(self, receipts):
+        now = time.monotonic()
+        for raw in receipts:
+            if raw is None:
+                continue
+            receipt = AttributeDict.recursive(receipt_formatter(raw))
+            with self.lock:
+                entry = self.pending.pop(Web3.to_hex(receipt["transactionHash"]), None)
+            if entry is not None:
+                future, tracked_at = entry
+                metrics.observe("confirm", now - tracked_at)
+                future.set_result(receipt)
+
+
+receipt_tracker = ReceiptTracker()
+
+
+class TxPipeline:
+    def __init__(
+        self,
+        max_in_flight=MAX_IN_FLIGHT,
+        timeout=RECEIPT_TIMEOUT,
+        journal=None,
+        step=None,
+        simulate=PREFLIGHT_SIMULATION,
+    ):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        self.pending = deque()
+        self.results = []
+        self.senders = {}
+        self.journal = journal
+        self.step = step
+        # Submitted transactions wait here until a batch of them has been
+        # simulated, at most SIMULATION_WINDOW seconds. Each is simulated
+        # without the effects of the others, so pipelines with dependent
+        # transactions from one sender pass False.
+        self.simulate = simulate
+        self.staged = []
+        self.simulated_reverts = []
+        self.lock = threading.Lock()
+
+    def _result(self, label, tx_hash, status):
+        self.results.append((label, tx_hash, status))
+        if self.journal is not None and label is not None:
+            self.journal.record(label, self.step, status, tx_hash)
+
+    def submit(self, transfer_tx, private_key, label=None):
+        """Returns True once sent, False on failure, or STAGED while waiting
+        for simulation; flush() reports what became of staged ones."""
+        if not self.simulate:
+            return self._send(transfer_tx, private_key, label)
+        with self.lock:
+            self.staged.append((transfer_tx, private_key, label))
+            if len(self.staged) >= SIMULATION_BATCH:
+                self._simulate_staged()
+            elif len(self.staged) == 1:
+                timer = threading.Timer(SIMULATION_WINDOW, self._simulate_window)
+                timer.daemon = True
+                timer.start()
+        return STAGED
+
+    def _simulate_window(self):
+        with self.lock:
+            if self.staged:
+                self._simulate_staged()
+
+    def _simulate_staged(self):
+        staged, self.staged = self.staged, []
+        reasons = simulate_transactions(
+            [
+                {**transfer_tx, "from": address_of(private_key)}
+                for transfer_tx, private_key, _ in staged
+            ]
+        )
+        for (transfer_tx, private_key, label), reason in zip(staged, reasons):
+            if reason is None:
+                self._send(transfer_tx, private_key, label)
+                continue
+            sender_address = address_of(private_key)
+            nonce_manager.release(sender_address, transfer_tx["nonce"])
+            self.senders[sender_address] = private_key
+            self.simulated_reverts.append((label, reason))
+            self._result(label, None, "simulated_revert")
+
+    def _send(self, transfer_tx, private_key, label=None):
+        while len(self.pending) >= self.max_in_flight:
+            self._collect(*self.pending.popleft())
+        tx_hash = broadcast_transaction(transfer_tx, private_key)
+        if tx_hash is None:
+            self._result(label, None, "failed")
+            return False
+        sender_address = address_of(private_key)
+        self.senders[sender_address] = private_key
+        self._track(label, tx_hash, transfer_tx, sender_address)
+        return True
+
+    def submit_signed(self, raw_tx, tx_hash, my_tx, sender_address, label=None):
+        while len(self.pending) >= self.max_in_flight:
+            self._collect(*self.pending.popleft())
+        try:
+            with metrics.timer("send"):
+                tx_hash = web3.eth.send_raw_transaction(raw_tx)
+        except Exception as e:
+            error = nonce_manager.classify_error(e)
+            if error != "known":
+                if error == "underpriced":
+                    gas_oracle.invalidate()
+                log.error(f"Error sending transaction: {e}")
+                nonce_manager.release(sender_address, my_tx["nonce"])
+                nonce_manager.resync(sender_address)
+                self._result(label, None, "failed")
+                return False
+            tx_hash = HexBytes(tx_hash)
+        nonce_manager.accept(sender_address, my_tx["nonce"])
+        log.info(f"Transaction sent. Hash: {tx_hash.hex()}")
+        self._track(label, tx_hash, my_tx, sender_address)
+        return True
+
+    def _track(self, label, tx_hash, transfer_tx, sender_address):
+        if self.journal is not None and label is not None:
+            self.journal.record(label, self.step, "sent", tx_hash.hex())
+        if CONFIRM_BY_BLOCKS:
+            future = receipt_tracker.track(tx_hash)
+        else:
+            future = self.executor.submit(self._confirm, tx_hash)
+        deadline = time.monotonic() + self.timeout
+        self.pending.append(
+            (
+                label,
+                tx_hash,
+                future,
+                gas_limits.key(transfer_tx),
+                (sender_address, transfer_tx["nonce"]),
+                deadline,
+            )
+        )
+
+    def _confirm(self, tx_hash):
+        with metrics.timer("confirm"):
+            return web3.eth.wait_for_transaction_receipt(tx_hash, self.timeout)
+
+    def _collect(self, label, tx_hash, future, gas_key, sender, deadline):
+        try:
+            receipt = future.result(timeout=max(0, deadline - time.monotonic()))
+            status = "success" if receipt.status == 1 else "reverted"
+        except Exception as e:
+            log.error(f"Receipt for {tx_hash.hex()} not received: {e or 'timed out'}")
+            receipt_tracker.forget(tx_hash)
+            nonce_manager.resync(*sender)
+            status = "timeout"
+        if status == "reverted":
+            gas_limits.invalidate(gas_key)
+        self._result(label, tx_hash.hex(), status)
+        return status
+
+    def flush(self):
+        with self.lock:
+            if self.staged:
+                self._simulate_staged()
+        while self.pending:
+            self._collect(*self.pending.popleft())
+        self.executor.shutdown(wait=True)
+        for address, private_key in self.senders.items():
+            nonce_manager.fill_gaps(address, private_key)
+
+        results, self.results = self.results, []
+        for label, tx_hash, status in results:
+            if status == "success":
+                log.info(f"{label} {tx_hash} successful.")
+            elif status != "simulated_revert":
+                log.error(f"{label} {tx_hash} {status}.")
+        reverts, self.simulated_reverts = self.simulated_reverts, []
+        if reverts:
+            log.warning(f"Not sent, {len(reverts)} transactions would revert:")
+            for label, reason in reverts:
+                log.warning(f"  {label}: {reason}")
+        succeeded = sum(1 for _, _, status in results if status == "success")
+        log.info(f"Pipeline finished: {succeeded}/{len(results)} transactions successful.")
+        return results
+
+
+class StepSender:
+    """Takes the place of a TxPipeline inside one scheduled step: it sends the
+    step's single transaction and keeps its hash for the scheduler."""
+
+    def __init__(self):
+        self.tx_hash = None
+        self.gas_key = None
+        self.private_key = None
+        self.nonce = None
+
+    def submit(self, transfer_tx, private_key, label=None):
+        tx_hash = broadcast_transaction(transfer_tx, private_key)
+        if tx_hash is None:
+            return False
+        self.tx_hash = tx_hash
+        self.gas_key = gas_limits.key(transfer_tx)
+        self.private_key = private_key
+        self.nonce = transfer_tx["nonce"]
+        return True
+
+
+class WalletScheduler:
+    """Moves every wallet through its own chain of transaction steps.
+
+    A wallet starts its next step as soon as the receipt of the previous one
+    arrives instead of waiting for that step to finish on every wallet. Each
+    step has its own sender threads and a cap on unconfirmed transactions, and
+    at most max_wallets chains are in progress, so a slow step holds back new
+    wallets rather than piling them up in front of it.
+    """
+
+    def __init__(
+        self, steps, max_wallets=STREAM_MAX_WALLETS, timeout=RECEIPT_TIMEOUT, journal=None
+    ):
+        # steps: (name, fn(context, sender), sender threads, unconfirmed cap).
+        # fn sends through sender like through a pipeline, or returns SKIPPED
+        # when the wallet needs no transaction; sending nothing otherwise is a
+        # failure.
+        self.steps = steps
+        self.max_wallets = max(1, int(max_wallets))
+        self.timeout = timeout
+        self.journal = journal
+        self.events = queue.Queue()
+        self.senders = {}
+        self.results = []
+
+    def _first_open_step(self, label):
+        for index, (name, _, _, _) in enumerate(self.steps):
+            if self.journal is None or not self.journal.is_done(label, name):
+                return index
+        return len(self.steps)
+
+    def _start(self, label, context, index):
+        name, fn, _, _ = self.steps[index]
+        started = time.monotonic()
+        sender = StepSender()
+        try:
+            result = fn(context, sender)
+        except Exception as e:
+            log.error(f"{label} {name} failed: {e}")
+            result = False
+        if sender.tx_hash is None:
+            status = "skipped" if result == SKIPPED else "failed"
+            self.events.put(("done", label, context, index, status, None, started))
+            return
+        self.senders[address_of(sender.private_key)] = sender.private_key
+        if self.journal is not None:
+            self.journal.record(label, name, "sent", sender.tx_hash.hex())
+        if CONFIRM_BY_BLOCKS:
+            future = receipt_tracker.track(sender.tx_hash)
+        else:
+            future = self.confirm_executor.submit(
+                web3.eth.wait_for_transaction_receipt, sender.tx_hash, self.timeout
+            )
+        self.events.put(("sent", label, context, index, sender, started, future))
+
+    def _finish(self, label, context, index, status, tx_hash, started):
+        name = self.steps[index][0]
+        self.running[index] -= 1
+        metrics.observe(f"step.{name}", time.monotonic() - started)
+        if self.journal is not None and status != "skipped":
+            self.journal.record(label, name, status, tx_hash)
+        self.results.append((label, name, tx_hash, status))
+        if status in ("success", "skipped") and index + 1 < len(self.steps):
+            self.waiting[index + 1].append((label, context))
+            return
+        self.active -= 1
+        if status not in ("success", "skipped"):
+            log.error(f"{label} stopped at {name}: {tx_hash or ''} {status}")
+
+    def _handle(self, event):
+        kind = event[0]
+        if kind == "done":
+            self._finish(*event[1:])
+        elif kind == "sent":
+            _, label, context, index, sender, started, future = event
+            key = Web3.to_hex(sender.tx_hash)
+            deadline = time.monotonic() + self.timeout
+            self.confirming[key] = (label, context, index, sender, started, deadline)
+            future.add_done_callback(lambda done, key=key: self.events.put(("receipt", key, done)))
+        elif kind == "receipt":
+            _, key, future = event
+            entry = self.confirming.pop(key, None)
+            if entry is None:
+                return  # already given up on
+            label, context, index, sender, started, _ = entry
+            try:
+                status = "success" if future.result().status == 1 else "reverted"
+            except Exception as e:
+                log.error(f"Receipt for {key} not received: {e or 'timed out'}")
+                nonce_manager.resync(address_of(sender.private_key), sender.nonce)
+                status = "timeout"
+            if status == "reverted":
+                gas_limits.invalidate(sender.gas_key)
+            self._finish(label, context, index, status, sender.tx_hash.hex(), started)
+
+    def _expire(self):
+        now = time.monotonic()
+        for key, entry in list(self.confirming.items()):
+            label, context, index, sender, started, deadline = entry
+            if now >= deadline:
+                del self.confirming[key]
+                receipt_tracker.forget(sender.tx_hash)
+                log.error(f"Receipt for {key} not received: timed out")
+                nonce_manager.resync(address_of(sender.private_key), sender.nonce)
+                self._finish(label, context, index, "timeout", sender.tx_hash.hex(), started)
+
+    def run(self, chains):
+        start = time.monotonic()
+        self.waiting = [deque() for _ in self.steps]
+        self.running = [0] * len(self.steps)
+        self.confirming = {}
+        self.active = 0
+        executors = [
+            ThreadPoolExecutor(max_workers=max(1, workers)) for _, _, workers, _ in self.steps
+        ]
+        self.confirm_executor = ThreadPoolExecutor(
+            max_workers=sum(max(1, limit) for _, _, _, limit in self.steps)
+        )
+        chains = iter(chains)
+        exhausted = False
+        count = 0
+        try:
+            while True:
+                while not exhausted and self.active < self.max_wallets:
+                    entry = next(chains, None)
+                    if entry is None:
+                        exhausted = True
+                        break
+                    count += 1
+                    index = self._first_open_step(entry[0])
+                    if index < len(self.steps):
+                        self.waiting[index].append(entry)
+                        self.active += 1
+                # Later steps go first so wallets close to the end finish and
+                # make room for new ones.
+                for index in reversed(range(len(self.steps))):
+                    limit = max(1, self.steps[index][3])
+                    while self.waiting[index] and self.running[index] < limit:
+                        label, context = self.waiting[index].popleft()
+                        self.running[index] += 1
+                        executors[index].submit(self._start, label, context, index)
+                if exhausted and not self.active:
+                    break
+                try:
+                    self._handle(self.events.get(timeout=1))
+                except queue.Empty:
+                    pass
+                self._expire()
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True)
+            self.confirm_executor.shutdown(wait=True)
+            for address, private_key in self.senders.items():
+                nonce_manager.fill_gaps(address, private_key)
+
+        for name, _, _, _ in self.steps:
+            statuses = [status for _, step, _, status in self.results if step == name]
+            log.info(
+                f"{name}: {statuses.count('success')} confirmed, "
+                f"{statuses.count('skipped')} not needed, "
+                f"{len(statuses) - statuses.count('success') - statuses.count('skipped')} failed"
+            )
+        log.info(f"Streamed {count} wallets in {time.monotonic() - start:.1f} s")
+        return self.results
+
+
+def bnb_transfer_tx(address_to, amount, nonce):
+    return {
         "to": address_to,
         "value": amount,
         "gas": 0,
         "gasPrice": 0,
         "nonce": nonce,
-        "chainId": 97,
+        "chainId": gas_oracle.chain_id,
     }
 
-    return sign_and_send_transaction(transfer_tx, private_key)
+
+def send_bnb(private_key, address_to, amount, nonce=None, pipeline=None):
+    if nonce is None:
+        nonce = nonce_manager.reserve(address_of(private_key))
+    transfer_tx = bnb_transfer_tx(address_to, amount, nonce)
+
+    return sign_and_send_transaction(transfer_tx, private_key, pipeline, address_to)
 
 def create_wallets(file_manager, count=None):
     existing_lines = file_manager.count_lines_in_file()
@@ -201,18 +2648,12 @@ def create_wallets(file_manager, count=None):
     else:
         input_range = count
     try:
-        if input_range < 1 or input_range > 100:
-            raise ValueError("Number of wallets must be a positive integer or 100 max")
+        if input_range < 1:
+            raise ValueError("Number of wallets must be a positive integer")
 
-        for i in range(existing_lines + 1, existing_lines + input_range + 1):
-            wallet_name, new_wallet_address, new_wallet_private_key = (
-                create_new_ethereum_wallet(f"{i}")
-            )
-            file_manager.save_to_txt(
-                wallet_name,
-                new_wallet_address,
-                new_wallet_private_key,
-            )
+        file_manager.append_lines_atomic(
+            generate_wallet_lines(existing_lines + 1, input_range)
+        )
         log.info(f"{input_range} wallets created successfully.")
     except ValueError as e:
         log.error(f"Invalid input: {e}")
@@ -240,8 +2681,6 @@ def delete_wallets(file_manager, confirm=None):
 
 
 def send_bnb_to_wallets(file_manager, private_key, amount_default=None):
-    wallet_data = file_manager.get_all_wallet_data_from_file()
-    nonce = web3.eth.get_transaction_count(Web3.to_checksum_address(Account.from_key(private_key).address))
     try:
         if amount_default is None or amount_default <= 0:
             amount = float(input("Amount BNB to send: "))
@@ -251,58 +2690,222 @@ def send_bnb_to_wallets(file_manager, private_key, amount_default=None):
         log.error("Invalid amount. Please enter a valid number.")
         return
 
-    for i, wallet in enumerate(wallet_data, start=1):
-        amount_wei = int(Web3.to_wei(amount, "ether"))
-        log.info(f"{i}. {wallet['address']}")
-        send_bnb(private_key, wallet["address"], amount_wei, nonce)
-        nonce += 1  # Increment nonce
-        #sleeping_time = random_time(5, 12)
-        log.info(f"Wait 0 second")
-        #time.sleep(sleeping_time)
+    amount_wei = int(Web3.to_wei(amount, "ether"))
+    sender_address = address_of(private_key)
+    use_disperse = DISPERSE_FUNDING and contracts.addresses.get("disperse_address")
+    sign_pool = None if use_disperse else start_sign_pool(file_manager.count_lines_in_file())
+    journal = RunJournal.for_operation("send_bnb", file_manager)
+    journal.resume_in_flight()
+
+    if use_disperse:
+        recipients = [
+            wallet["address"]
+            for wallet_chunk in file_manager.iter_wallet_chunks()
+            for wallet in wallet_chunk
+            if not journal.is_done(wallet["address"], "fund")
+        ]
+        disperse_transfers(
+            private_key, recipients, [amount_wei] * len(recipients), journal=journal, step="fund"
+        )
+        journal.complete()
+        return
+    if DISPERSE_FUNDING:
+        log.warning("No disperse_address in contracts.json, funding wallets one by one")
+    pipeline = TxPipeline(journal=journal, step="fund")
+    pipeline.senders[sender_address] = private_key
 
+    i = 0
+    try:
+        for wallet_chunk in file_manager.iter_wallet_chunks():
+            prepared = []
+            for wallet in wallet_chunk:
+                if journal.is_done(wallet["address"], "fund"):
+                    log.info(f"{wallet['address']} already funded in the last run")
+                    continue
+                transfer_tx = bnb_transfer_tx(
+                    wallet["address"], amount_wei, nonce_manager.reserve(sender_address)
+                )
+                try:
+                    prepared.append((wallet, prepare_transaction(transfer_tx)))
+                except Exception as e:
+                    log.error(f"Error preparing transaction to {wallet['address']}: {e}")
+                    nonce_manager.release(sender_address, transfer_tx["nonce"])
+
+            signed = sign_transactions(
+                [(transfer_tx, private_key) for _, transfer_tx in prepared], sign_pool
+            )
+            for (wallet, transfer_tx), (raw_tx, tx_hash) in zip(prepared, signed):
+                i += 1
+                log.info(f"{i}. {wallet['address']}")
+                if raw_tx is None:
+                    log.error(f"Error signing transaction: {tx_hash}")
+                    nonce_manager.release(sender_address, transfer_tx["nonce"])
+                    continue
+                pipeline.submit_signed(
+                    raw_tx, tx_hash, transfer_tx, sender_address, wallet["address"]
+                )
+                #sleeping_time = random_time(5, 12)
+                log.info(f"Wait 0 second")
+                #time.sleep(sleeping_time)
+    finally:
+        if sign_pool is not None:
+            sign_pool.shutdown()
+    pipeline.flush()
+    journal.complete()
+
+
+def deploy_disperse(private_key):
+    with open(f"{contracts.abi_dir}/disperse.bin", mode="r", encoding="utf-8") as file:
+        bytecode = file.read().strip()
+    sender_address = address_of(private_key)
+    deploy_tx = {
+        "from": sender_address,
+        "value": 0,
+        "gas": 0,
+        "gasPrice": 0,
+        "nonce": nonce_manager.reserve(sender_address),
+        "data": bytecode,
+        "chainId": gas_oracle.chain_id,
+    }
+    tx_hash = broadcast_transaction(deploy_tx, private_key)
+    if tx_hash is None:
+        return None
+    receipt = web3.eth.wait_for_transaction_receipt(tx_hash, RECEIPT_TIMEOUT)
+    if receipt.status != 1:
+        log.error(f"Disperse deployment {tx_hash.hex()} reverted")
+        return None
+    contracts.set_address("disperse_address", receipt.contractAddress)
+    log.info(f"Disperse contract deployed at {receipt.contractAddress}, saved to contracts.json")
+    return receipt.contractAddress
+
+
+def disperse_transfers(private_key, recipients, amounts, token=None, journal=None, step=None):
+    """Sends amounts[i] to recipients[i] in as few transactions as the block
+    gas limit allows; BNB when token is None, otherwise that ERC20 contract.
+    Returns the transaction status for every recipient."""
+    sender_address = address_of(private_key)
+    disperse = contracts.disperse()
+    statuses = {}
+    if not recipients:
+        return statuses
+
+    def call(chunk_recipients, chunk_amounts):
+        if token is None:
+            fn = disperse.functions.disperseEther(chunk_recipients, chunk_amounts)
+            return fn, sum(chunk_amounts)
+        fn = disperse.functions.disperseToken(token.address, chunk_recipients, chunk_amounts)
+        return fn, 0
+
+    if token is not None:
+        allowance = token.functions.allowance(sender_address, disperse.address).call()
+        if allowance < sum(amounts):
+            approve = token.functions.approve(disperse.address, APPROVE_AMOUNT)
+            approve_tx = approve.build_transaction(
+                {
+                    "from": sender_address,
+                    "gas": 0,
+                    "gasPrice": 0,
+                    "nonce": nonce_manager.reserve(sender_address),
+                    "chainId": gas_oracle.chain_id,
+                }
+            )
+            approve_pipeline = TxPipeline(simulate=False)
+            approve_pipeline.submit(approve_tx, private_key, sender_address)
+            if approve_pipeline.flush()[0][2] != "success":
+                log.error("Disperse approval failed, nothing sent")
+                return {recipient: "failed" for recipient in recipients}
+
+    # The per-recipient cost measured on a small chunk includes the base cost,
+    # so chunks sized from it stay below the budget.
+    probe = min(len(recipients), 16)
+    fn, value = call(recipients[:probe], amounts[:probe])
+    per_recipient = fn.estimate_gas({"from": sender_address, "value": value}) / probe
+    gas_budget = web3.eth.get_block("latest")["gasLimit"] * DISPERSE_BLOCK_GAS_SHARE
+    chunk_size = max(1, min(DISPERSE_MAX_RECIPIENTS, int(gas_budget // per_recipient)))
+
+    groups = GroupJournal(journal) if journal is not None else None
+    pipeline = TxPipeline(journal=groups, step=step, simulate=False)
+    chunks = {}
+    for start in range(0, len(recipients), chunk_size):
+        chunk_recipients = recipients[start : start + chunk_size]
+        chunk_amounts = amounts[start : start + chunk_size]
+        label = f"disperse {start + 1}-{start + len(chunk_recipients)}"
+        fn, value = call(chunk_recipients, chunk_amounts)
+        nonce = nonce_manager.reserve(sender_address)
+        try:
+            gas_limit = fn.estimate_gas({"from": sender_address, "value": value})
+        except Exception as e:
+            log.error(f"{label} would fail: {e}")
+            nonce_manager.release(sender_address, nonce)
+            statuses.update((recipient, "failed") for recipient in chunk_recipients)
+            continue
+        chunks[label] = chunk_recipients
+        if groups is not None:
+            groups.groups[label] = chunk_recipients
+        disperse_tx = fn.build_transaction(
+            {
+                "from": sender_address,
+                "value": value,
+                "gas": int(gas_limit * GAS_LIMIT_MARGIN),
+                "gasPrice": 0,
+                "nonce": nonce,
+                "chainId": gas_oracle.chain_id,
+            }
+        )
+        log.info(f"{label}: {len(chunk_recipients)} recipients, {gas_limit} gas")
+        pipeline.submit(disperse_tx, private_key, label)
+    for label, _, status in pipeline.flush():
+        for recipient in chunks.get(label, ()):
+            statuses[recipient] = status
+    succeeded = sum(1 for status in statuses.values() if status == "success")
+    log.info(
+        f"Dispersed to {succeeded}/{len(recipients)} wallets in {len(chunks)} transactions"
+    )
+    return statuses
 
-def claim_faucet(sender_address, private_key):
-    with open("abi/contracts.json", "r") as json_file:
-        data = json.load(json_file)
 
+def claim_faucet(sender_address, private_key, pipeline=None):
     data_to_send = f"0xee42b5c7000000000000000000000000{sender_address[2:].lower()}000000000000000000000000000000000000000000000000000000000000006000000000000000000000000000000000000000000000000000000000000000a00000000000000000000000000000000000000000000000000000000000000001300000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000013000000000000000000000000000000000000000000000000000000000000000"
     transaction_faucet = {
         "from": sender_address,
-        "to": data["contract_address"],
+        "to": contracts.faucet_address(),
         "value": 0,
         "gas": 0,
         "gasPrice": 0,
-        "nonce": web3.eth.get_transaction_count(Web3.to_checksum_address(Account.from_key(private_key).address)),
+        "nonce": nonce_manager.reserve(address_of(private_key)),
         "data": data_to_send,
-        "chainId": 97,
+        "chainId": gas_oracle.chain_id,
     }
 
-    return sign_and_send_transaction(transaction_faucet, private_key)
+    return sign_and_send_transaction(
+        transaction_faucet, private_key, pipeline, sender_address
+    )
 
 
 def claim_faucet_to_wallets(file_manager):
-
-    wallet_data = file_manager.get_all_wallet_data_from_file()
-
-    for i, wallet in enumerate(wallet_data, start=1):
-        checker = claim_faucet(wallet["address"], wallet["private_key"])
-        if checker:
-            #sleeping_time = random_time(5, 10)
-            log.info(f"{i}. {wallet['address']} claimed $NLK and wait 0 second")
-            #time.sleep(sleeping_time)
-        else:
-            continue
+    journal = RunJournal.for_operation("claim_faucet", file_manager)
+    journal.resume_in_flight()
+    pipeline = TxPipeline(journal=journal, step="faucet")
+    i = 0
+    for wallet_chunk in file_manager.iter_wallet_chunks():
+        for wallet in wallet_chunk:
+            i += 1
+            if journal.is_done(wallet["address"], "faucet"):
+                continue
+            checker = claim_faucet(wallet["address"], wallet["private_key"], pipeline)
+            if checker:
+                #sleeping_time = random_time(5, 10)
+                log.info(f"{i}. {wallet['address']} $NLK claim submitted and wait 0 second")
+                #time.sleep(sleeping_time)
+            else:
+                continue
+    pipeline.flush()
+    journal.complete()
 
 
 def get_pending_user_reward(private_key):
-    with open("abi/contracts.json", "r") as json_file:
-        data = json.load(json_file)
-    with open("abi/nulink.json", "r") as file:
-        nulink_abi = json.load(file)
-    sender_address = Web3.to_checksum_address(Account.from_key(private_key).address)
-
-    stake_contract_address = data["stake_contract_address"]
-    stake_contract = web3.eth.contract(address=stake_contract_address, abi=nulink_abi)
+    sender_address = address_of(private_key)
+    stake_contract = contracts.stake_contract()
 
     try:
         pending_reward = stake_contract.functions.pendingUserReward(
@@ -316,25 +2919,23 @@ def get_pending_user_reward(private_key):
 
 
 def get_pending_user_reward_wallets(file_manager):
+    if ASYNC_CONCURRENCY:
+        return get_pending_user_reward_wallets_async(file_manager, ASYNC_CONCURRENCY)
     wallet_data = file_manager.get_all_wallet_data_from_file()
+    wallet_addresses = wallet_addresses_from(wallet_data)
+    pending_rewards = batch_pending_rewards(wallet_addresses)
 
-    for i, wallet in enumerate(wallet_data, start=1):
-        rewards = get_pending_user_reward(wallet["private_key"])
-        wallet_address = Web3.to_checksum_address(
-            Account.from_key(wallet["private_key"]).address
-        )
+    for i, (wallet_address, pending_reward) in enumerate(
+        zip(wallet_addresses, pending_rewards), start=1
+    ):
+        rewards = None
+        if pending_reward is not None:
+            rewards = round(Web3.from_wei(pending_reward, "ether"), 3)
         log.info(f"{i}. Rewards {wallet_address} {rewards} Nulink")
 
 
 def get_token_balance(token_address, wallet_address):
-    with open("abi/contracts.json", mode="r", encoding="utf-8") as contracts:
-        contracts = json.load(contracts)
-    with open("abi/erc20.json", mode="r", encoding="utf-8") as erc20_abi:
-        erc20_abi = json.load(erc20_abi)
-
-    contract_address = Web3.to_checksum_address(token_address)
-
-    contract = web3.eth.contract(address=contract_address, abi=erc20_abi)
+    contract = contracts.contract_at(token_address, "erc20")
     wallet_address = Web3.to_checksum_address(wallet_address)
     balance = contract.functions.balanceOf(wallet_address).call()
 
@@ -342,20 +2943,21 @@ def get_token_balance(token_address, wallet_address):
 
 
 def get_token_balance_wallets(nulink_manager):
-    with open("abi/contracts.json", mode="r", encoding="utf-8") as contracts:
-        contracts = json.load(contracts)
-
-    nulink_token_address = contracts["nulink_token_address"]
+    if ASYNC_CONCURRENCY:
+        return get_token_balance_wallets_async(nulink_manager, ASYNC_CONCURRENCY)
+    nulink_token_address = contracts.address("nulink_token_address")
     wallet_data = nulink_manager.get_all_wallet_data_from_file()
 
     wallet_info = []
+    wallet_addresses = wallet_addresses_from(wallet_data)
+    balances = batch_token_balances(wallet_addresses)
 
-    for i, wallet in enumerate(wallet_data, start=1):
-        sender_address = Web3.to_checksum_address(
-            Account.from_key(wallet["private_key"]).address
-        )
+    for i, (wallet, sender_address, balance_nulink_wei) in enumerate(
+        zip(wallet_data, wallet_addresses, balances), start=1
+    ):
         private_key_wallet = wallet["private_key"]
-        balance_nulink_wei = get_token_balance(nulink_token_address, sender_address)
+        if balance_nulink_wei is None:
+            balance_nulink_wei = get_token_balance(nulink_token_address, sender_address)
         balance_nulink = Web3.from_wei(balance_nulink_wei, "ether")
         log.info(f"{i}. {sender_address} : {balance_nulink} NLK")
         wallet_info.append(
@@ -369,21 +2971,16 @@ def get_token_balance_wallets(nulink_manager):
     return wallet_info
 
 
-def stake(private_key):
-    with open("abi/contracts.json", mode="r", encoding="utf-8") as contracts:
-        contracts = json.load(contracts)
-    with open("abi/nulink.json", mode="r", encoding="utf-8") as json_file:
-        nulink_abi = json.load(json_file)
-
-    stake_contract_address = contracts["stake_contract_address"]
-    nulink_token_address = contracts["nulink_token_address"]
+def stake(private_key, amount=None, pipeline=None):
+    nulink_token_address = contracts.address("nulink_token_address")
 
-    sender_address = Web3.to_checksum_address(Account.from_key(private_key).address)
+    sender_address = address_of(private_key)
     log.info(sender_address)
 
-    stake_contract = web3.eth.contract(address=stake_contract_address, abi=nulink_abi)
+    stake_contract = contracts.stake_contract()
 
-    amount = get_token_balance(nulink_token_address, sender_address)
+    if amount is None:
+        amount = get_token_balance(nulink_token_address, sender_address)
     amount_nulink = amount / 10**18
     log.info(f"Staking amount: {amount_nulink}")
 
@@ -392,7 +2989,7 @@ def stake(private_key):
         amount -= int(random_subtract * 10**18)
         # log.info(f"Subtracted amount: {random_subtract}")
 
-        nonce = web3.eth.get_transaction_count(sender_address)
+        nonce = nonce_manager.reserve(sender_address)
 
         stake_tx = stake_contract.functions.stake(
             sender_address, sender_address, sender_address, amount
@@ -402,48 +2999,104 @@ def stake(private_key):
                 "gas": 0,
                 "nonce": nonce,
                 "gasPrice": 0,
-                "chainId": 97,
+                "chainId": gas_oracle.chain_id,
             }
         )
-        return sign_and_send_transaction(stake_tx, private_key)
+        return sign_and_send_transaction(stake_tx, private_key, pipeline, sender_address)
     else:
         log.info(f"Amount Nulink token is: {amount_nulink} NLK. Not need stake")
-        return True, 0
+        return SKIPPED
 
 
 def stake_wallets(file_manager):
+    if ASYNC_CONCURRENCY:
+        return stake_wallets_async(file_manager, ASYNC_CONCURRENCY)
+    journal = RunJournal.for_operation("stake", file_manager)
+    journal.resume_in_flight()
     wallet_data = file_manager.get_all_wallet_data_from_file()
-
-    for i, wallet in enumerate(wallet_data, start=1):
-        approve = approve_token_spending(wallet["private_key"])
+    wallet_addresses = wallet_addresses_from(wallet_data)
+
+    # Allowances already known from earlier runs are not read again; balances
+    # move with every reward claim, so they are read once per run.
+    token = contracts.token()
+    spender = contracts.address("stake_contract_address")
+    allowance_cache.sync(token.address, spender)
+    unknown = [
+        address
+        for address in wallet_addresses
+        if allowance_cache.get(token.address, address, spender) is None
+    ]
+    results = read_contract_calls(
+        [(token, "balanceOf", [address]) for address in wallet_addresses]
+        + [(token, "allowance", [address, spender]) for address in unknown]
+    )
+    for address, allowance in zip(unknown, results[len(wallet_addresses) :]):
+        if allowance is not None:
+            allowance_cache.set(token.address, address, spender, allowance)
+    wallet_states = [
+        {
+            "balance": balance,
+            "allowance": allowance_cache.get(token.address, address, spender),
+        }
+        for address, balance in zip(wallet_addresses, results)
+    ]
+
+    # Approvals must be mined before stake() can be estimated, so they go
+    # through their own pipeline first.
+    approve_pipeline = TxPipeline(journal=journal, step="approve")
+    approved = []
+    for i, (wallet, state) in enumerate(zip(wallet_data, wallet_states), start=1):
+        if journal.is_done(wallet["address"], "stake"):
+            log.info(f"{wallet['address']} already staked in the last run")
+            continue
+        if allowance_cache.is_sufficient(
+            token.address, wallet["address"], spender, state["balance"]
+        ):
+            approved.append((wallet, state))
+            continue
+        approve = approve_token_spending(
+            wallet["private_key"], state["allowance"], state["balance"], approve_pipeline
+        )
         if approve:
-            #log.info("Approve done.")
-            #sleeping_time = random_time(10, 20)
-            stake_checker = stake(wallet["private_key"])
-            if stake_checker is not None:
-                #sleeping_time = random_time(3, 5)
-                log.info(f"Wait 0 second")
-                #time.sleep(sleeping_time)
-            else:
-                continue
+            approved.append((wallet, state))
+    failed_approvals = set()
+    for label, _, status in approve_pipeline.flush():
+        if status == "success":
+            allowance_cache.set(token.address, label, spender, APPROVE_AMOUNT)
+        else:
+            failed_approvals.add(label)
 
+    stake_pipeline = TxPipeline(journal=journal, step="stake")
+    for wallet, state in approved:
+        if wallet["address"] in failed_approvals:
+            continue
+        #log.info("Approve done.")
+        #sleeping_time = random_time(10, 20)
+        stake_checker = stake(wallet["private_key"], state["balance"], stake_pipeline)
+        if stake_checker is not None:
+            #sleeping_time = random_time(3, 5)
+            log.info(f"Wait 0 second")
+            #time.sleep(sleeping_time)
+        else:
+            continue
+    for label, _, status in stake_pipeline.flush():
+        if status in ("reverted", "simulated_revert"):
+            allowance_cache.invalidate(token.address, label, spender)
+    allowance_cache.sync(token.address, spender)
+    allowance_cache.save()
+    journal.complete()
 
-def claim_rewards(private_key):
-    with open("abi/contracts.json", mode="r", encoding="utf-8") as contracts:
-        contracts = json.load(contracts)
-    with open("abi/nulink.json", mode="r", encoding="utf-8") as json_file:
-        nulink_abi = json.load(json_file)
 
-    sender_address = Web3.to_checksum_address(Account.from_key(private_key).address)
-    stake_contract = web3.eth.contract(
-        address=contracts["stake_contract_address"], abi=nulink_abi
-    )
+def claim_rewards(private_key, get_rewards_pending=None, pipeline=None):
+    sender_address = address_of(private_key)
+    stake_contract = contracts.stake_contract()
 
-    get_rewards_pending = get_pending_user_reward(private_key)
+    if get_rewards_pending is None:
+        get_rewards_pending = get_pending_user_reward(private_key)
 
-    if get_rewards_pending > 1:
+    if get_rewards_pending is not None and get_rewards_pending > 1:
 
-        nonce = web3.eth.get_transaction_count(sender_address)
+        nonce = nonce_manager.reserve(sender_address)
         claim_tx = stake_contract.functions.claimReward(
             sender_address
         ).build_transaction(
@@ -452,44 +3105,47 @@ def claim_rewards(private_key):
                 "gas": 0,
                 "nonce": nonce,
                 "gasPrice": 0,
-                "chainId": 97,
+                "chainId": gas_oracle.chain_id,
             }
         )
-        return sign_and_send_transaction(claim_tx, private_key)
+        return sign_and_send_transaction(claim_tx, private_key, pipeline, sender_address)
+    elif get_rewards_pending is None:
+        log.error(f"Pending rewards of {sender_address} could not be read")
+        return None
     else:
         log.error(
             f"\033[93mWallet {sender_address} have only {get_rewards_pending} Nulink. Not need claim now\033[0m",
         )
-        return False, 0
+        return SKIPPED
 
 
 def claim_rewards_wallets(file_manager):
+    if ASYNC_CONCURRENCY:
+        return claim_rewards_wallets_async(file_manager, ASYNC_CONCURRENCY)
     wallet_data = file_manager.get_all_wallet_data_from_file()
+    wallet_addresses = wallet_addresses_from(wallet_data)
+    pending_rewards = batch_pending_rewards(wallet_addresses)
 
-    for i, wallet in enumerate(wallet_data, start=1):
-
-        checker_claim = claim_rewards(wallet["private_key"])
-        if checker_claim == True:
+    pipeline = TxPipeline()
+    for i, (wallet, pending_reward) in enumerate(
+        zip(wallet_data, pending_rewards), start=1
+    ):
+        if pending_reward is not None:
+            pending_reward = round(Web3.from_wei(pending_reward, "ether"), 3)
+        checker_claim = claim_rewards(wallet["private_key"], pending_reward, pipeline)
+        if checker_claim in (True, STAGED):
             #sleeping_time = random_time(10, 15)
             log.info(f"Wait 0 second")
             #time.sleep(sleeping_time)
         else:
             continue
+    pipeline.flush()
 
 
-def send_nulink(private_key_sender, address_to_send, amount_input):
-    with open("abi/contracts.json", mode="r", encoding="utf-8") as contracts_file:
-        my_contracts = json.load(contracts_file)
-    with open("abi/erc20.json", mode="r", encoding="utf-8") as erc20_abi_file:
-        erc20_abi = json.load(erc20_abi_file)
-
-    contract = web3.eth.contract(
-        address=my_contracts["nulink_token_address"], abi=erc20_abi
-    )
-    sender_address = Web3.to_checksum_address(
-        Account.from_key(private_key_sender).address
-    )
-    amount = get_token_balance(my_contracts["nulink_token_address"], sender_address)
+def send_nulink(private_key_sender, address_to_send, amount_input, pipeline=None):
+    contract = contracts.token()
+    sender_address = address_of(private_key_sender)
+    amount = get_token_balance(contract.address, sender_address)
     amount_nulink = amount / 10**18
 
     if amount_input != None:
@@ -504,89 +3160,436 @@ def send_nulink(private_key_sender, address_to_send, amount_input):
                 "from": sender_address,
                 "gas": 0,
                 "gasPrice": 0,
-                "nonce": web3.eth.get_transaction_count(sender_address),
-                "chainId": 97,
+                "nonce": nonce_manager.reserve(sender_address),
+                "chainId": gas_oracle.chain_id,
             }
         )
 
-        return sign_and_send_transaction(transfer_tx, private_key_sender)
+        return sign_and_send_transaction(
+            transfer_tx, private_key_sender, pipeline, sender_address
+        )
     else:
         log.info(f"\033[91mAmount: {amount_nulink} NLK. Cannot send it\033[0m")
-        return True, 0
+        return SKIPPED
 
 
 def send_nulink_to_wallets(file_manager, nulink_manager):
     wallet_new_data = file_manager.get_all_wallet_data_from_file()
-    wallet_nulink_data = nulink_manager.get_all_wallet_data_from_file()
+    wallet_nulink_data = list(nulink_manager.get_all_wallet_data_from_file())
 
     randomize_nulink = True  # False if not need random Nulink wallets
 
     if randomize_nulink:
         random.shuffle(wallet_nulink_data)
 
+    journal = RunJournal.for_operation("send_nulink", file_manager)
+    journal.resume_in_flight()
+    pipeline = TxPipeline(journal=journal, step="send_nlk")
     for i, (new_wallet, nulink_wallet) in enumerate(
         zip(wallet_new_data, wallet_nulink_data), start=1
     ):
-        nulink_wallet_node = Web3.to_checksum_address(
-            Account.from_key(nulink_wallet["private_key"]).address
-        )
-        new_wallet_bnb = Web3.to_checksum_address(
-            Account.from_key(new_wallet["private_key"]).address
-        )
+        nulink_wallet_node = nulink_wallet["address"]
+        new_wallet_bnb = new_wallet["address"]
+        if journal.is_done(new_wallet_bnb, "send_nlk"):
+            continue
 
 
-        send_checker = send_nulink(new_wallet["private_key"], nulink_wallet_node, None)
-        if send_checker == True:
+        send_checker = send_nulink(
+            new_wallet["private_key"], nulink_wallet_node, None, pipeline
+        )
+        if send_checker in (True, STAGED):
             #sleeping_time = random_time(5, 15)            
             log.info(f"{i}.Try send from {new_wallet_bnb} to {nulink_wallet_node} 10 NLK and wait 0 second")
             #time.sleep(sleeping_time)
         else:
             continue
-        
-
-def approve_token_spending(private_key):
-    with open("abi/contracts.json", mode="r", encoding="utf-8") as contracts_file:
-        my_contracts = json.load(contracts_file)
-    with open("abi/erc20.json", mode="r", encoding="utf-8") as erc20_abi_file:
-        erc20_abi = json.load(erc20_abi_file)
-
-    spender_address = my_contracts["stake_contract_address"]
-    sender_address = Web3.to_checksum_address(Account.from_key(private_key).address)
-    contract = web3.eth.contract(
-        address=my_contracts["nulink_token_address"], abi=erc20_abi
-    )
+    pipeline.flush()
+    journal.complete()
 
-    allowance_amount = contract.functions.allowance(
-        sender_address,
-        spender_address,
-    ).call()
 
-    amount = get_token_balance(my_contracts["nulink_token_address"], sender_address)
+def send_nulink_from_main(nulink_manager, private_key_main, amount=None):
+    if not contracts.addresses.get("disperse_address"):
+        log.error("Add disperse_address to contracts.json or deploy the disperse contract first")
+        return
+    try:
+        if amount is None or amount <= 0:
+            amount = float(input("Amount NLK to send to every node wallet: "))
+    except ValueError:
+        log.error("Invalid amount. Please enter a valid number.")
+        return
+    amount_wei = int(Web3.to_wei(amount, "ether"))
+    journal = RunJournal.for_operation("disperse_nlk", nulink_manager)
+    journal.resume_in_flight()
+    recipients = [
+        address
+        for address in wallet_addresses_from(nulink_manager.get_all_wallet_data_from_file())
+        if not journal.is_done(address, "send_nlk")
+    ]
+    disperse_transfers(
+        private_key_main,
+        recipients,
+        [amount_wei] * len(recipients),
+        token=contracts.token(),
+        journal=journal,
+        step="send_nlk",
+    )
+    journal.complete()
+
+
+def approve_token_spending(
+    private_key, allowance_amount=None, amount=None, pipeline=None
+):
+    spender_address = contracts.address("stake_contract_address")
+    sender_address = address_of(private_key)
+    contract = contracts.token()
+
+    if allowance_amount is None or amount is None:
+        allowance_amount, amount = batch_eth_call(
+            [
+                eth_call_request(
+                    contract, "allowance", [sender_address, spender_address]
+                ),
+                eth_call_request(contract, "balanceOf", [sender_address]),
+            ]
+        )
+    if allowance_amount is None:
+        allowance_amount = contract.functions.allowance(
+            sender_address,
+            spender_address,
+        ).call()
+    if amount is None:
+        amount = get_token_balance(contract.address, sender_address)
 
     if allowance_amount < amount:
-        nonce = web3.eth.get_transaction_count(sender_address)
+        nonce = nonce_manager.reserve(sender_address)
         approve_tx = contract.functions.approve(
-            spender_address, 2**256 - 5
+            spender_address, APPROVE_AMOUNT
         ).build_transaction(
             {
                 "from": sender_address,
                 "gas": 0,
                 "nonce": nonce,
                 "gasPrice": 0,
-                "chainId": 97,
+                "chainId": gas_oracle.chain_id,
             }
         )
-        return sign_and_send_transaction(approve_tx, private_key)
+        return sign_and_send_transaction(approve_tx, private_key, pipeline, sender_address)
     else:
-        return True
+        return SKIPPED
+
+
+async def async_metrics_middleware(make_request, w3):
+    async def middleware(method, params):
+        with metrics.timer(f"rpc.{method}", w3.provider.endpoint_uri):
+            return await make_request(method, params)
+
+    return middleware
+
+
+async def async_rate_limit_middleware(make_request, w3):
+    limiter = RateLimiter.for_url(w3.provider.endpoint_uri)
+
+    async def middleware(method, params):
+        for attempt in range(RPC_RATE_RETRIES + 1):
+            wait = limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                response = await make_request(method, params)
+                retry_after = rate_limit_delay(response)
+            except Exception as e:
+                retry_after = rate_limit_delay(e)
+                if retry_after is None:
+                    raise
+                limiter.record_limit(retry_after, attempt=attempt + 1)
+                if attempt == RPC_RATE_RETRIES:
+                    raise
+                continue
+            if retry_after is None:
+                limiter.record_success()
+                return response
+            limiter.record_limit(retry_after, attempt=attempt + 1)
+            if attempt == RPC_RATE_RETRIES:
+                return response
+
+    return middleware
+
+
+class AsyncEngine:
+    def __init__(self, rpc_url, concurrency):
+        self.rpc_url = rpc_url
+        self.concurrency = max(1, int(concurrency))
+
+    async def __aenter__(self):
+        provider = AsyncHTTPProvider(self.rpc_url)
+        # The provider's own retry middleware resends a 429 right away five
+        # times; rate limits are handled by async_rate_limit_middleware.
+        provider.middlewares = ()
+        self.w3 = AsyncWeb3(provider)
+        # The validation middleware asks for eth_chainId before every call;
+        # transactions here always carry an explicit chainId.
+        self.w3.middleware_onion.remove("validation")
+        self.w3.middleware_onion.add(async_metrics_middleware, "metrics")
+        self.w3.middleware_onion.add(async_rate_limit_middleware, "rate_limit")
+        self.connections = {"created": 0, "reused": 0}
+        trace = TraceConfig()
+        trace.on_connection_create_end.append(self._count_connection("created"))
+        trace.on_connection_reuseconn.append(self._count_connection("reused"))
+        self.session = ClientSession(
+            connector=TCPConnector(
+                limit=max(self.concurrency, RPC_POOL_SIZE),
+                keepalive_timeout=RPC_KEEPALIVE,
+                ttl_dns_cache=300,
+            ),
+            timeout=ClientTimeout(total=RPC_TIMEOUT),
+            trace_configs=[trace],
+        )
+        await self.w3.provider.cache_async_session(self.session)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.chain_id = await asyncio.to_thread(lambda: gas_oracle.chain_id)
+        self.token = self.w3.eth.contract(
+            address=contracts.address("nulink_token_address"), abi=contracts.abi("erc20")
+        )
+        self.stake_contract = self.w3.eth.contract(
+            address=contracts.address("stake_contract_address"),
+            abi=contracts.abi("nulink"),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # web3 keeps the session cached per thread and URL; a closed one left
+        # there is swapped for a plain default session on the next run.
+        cache_key = generate_cache_key(f"{threading.get_ident()}:{self.rpc_url}")
+        if _async_session_cache.get_cache_entry(cache_key) is self.session:
+            _async_session_cache.pop(cache_key)
+        await self.session.close()
+        log.info(
+            f"Async RPC connections: {self.connections['created']} opened, "
+            f"{self.connections['reused']} reused"
+        )
+
+    def _count_connection(self, kind):
+        async def count(session, context, params):
+            self.connections[kind] += 1
+
+        return count
+
+    async def bounded(self, coro):
+        async with self.semaphore:
+            return await coro
+
+    async def gather(self, coros):
+        return await asyncio.gather(*[self.bounded(coro) for coro in coros])
+
+    async def token_balance(self, address):
+        try:
+            return await self.token.functions.balanceOf(address).call()
+        except Exception as e:
+            log.error(f"Balance check for {address} failed: {e}")
+            return None
+
+    async def pending_reward(self, address):
+        try:
+            pending_reward = await self.stake_contract.functions.pendingUserReward(
+                address
+            ).call()
+            return round(Web3.from_wei(pending_reward, "ether"), 3)
+        except Exception:
+            return None
+
+    async def send_transaction(self, my_tx, private_key, sender_address):
+        try:
+            fees = await asyncio.to_thread(gas_oracle.fee_fields)
+            gas_limit = gas_limits.get(my_tx)
+            if gas_limit is None:
+                estimate = await self.w3.eth.estimate_gas(my_tx)
+                gas_limits.record(my_tx, estimate)
+                gas_limit = int(estimate * gas_limits.margin)
+            my_tx["gas"] = gas_limit
+            if "gasPrice" not in fees:
+                my_tx.pop("gasPrice", None)
+            my_tx.update(fees)
+            with metrics.timer("sign"):
+                signed_tx = Account.sign_transaction(my_tx, private_key)
+            with metrics.timer("send"):
+                tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as e:
+            log.error(f"Error signing or sending transaction: {e}")
+            if nonce_manager.classify_error(e) == "underpriced":
+                gas_oracle.invalidate()
+            nonce_manager.release(sender_address, my_tx["nonce"])
+            await asyncio.to_thread(nonce_manager.resync, sender_address)
+            return False
+
+        nonce_manager.accept(sender_address, my_tx["nonce"])
+        log.info(f"Transaction sent. Hash: {tx_hash.hex()}")
+        try:
+            with metrics.timer("confirm"):
+                tx_receipt = await self.w3.eth.wait_for_transaction_receipt(
+                    tx_hash, RECEIPT_TIMEOUT
+                )
+        except Exception as e:
+            log.error(f"Receipt for {tx_hash.hex()} not received: {e}")
+            await asyncio.to_thread(nonce_manager.resync, sender_address, my_tx["nonce"])
+            return False
+        if tx_receipt.status == 1:
+            log.info("Transaction successful.")
+            return True
+        log.error("Transaction failed. Reverted.")
+        gas_limits.invalidate(gas_limits.key(my_tx))
+        return False
+
+    async def build_transaction(self, contract_function, sender_address):
+        nonce = await asyncio.to_thread(nonce_manager.reserve, sender_address)
+        return await contract_function.build_transaction(
+            {
+                "from": sender_address,
+                "gas": 0,
+                "nonce": nonce,
+                "gasPrice": 0,
+                "chainId": self.chain_id,
+            }
+        )
+
+    async def claim_rewards(self, private_key):
+        sender_address = address_of(private_key)
+        get_rewards_pending = await self.pending_reward(sender_address)
+
+        if get_rewards_pending is not None and get_rewards_pending > 1:
+            claim_tx = await self.build_transaction(
+                self.stake_contract.functions.claimReward(sender_address),
+                sender_address,
+            )
+            return await self.send_transaction(claim_tx, private_key, sender_address)
+        log.error(
+            f"\033[93mWallet {sender_address} have only {get_rewards_pending} Nulink. Not need claim now\033[0m",
+        )
+        return False
+
+    async def approve_and_stake(self, private_key):
+        sender_address = address_of(private_key)
+        spender_address = self.stake_contract.address
+        try:
+            amount, allowance_amount = await asyncio.gather(
+                self.token.functions.balanceOf(sender_address).call(),
+                self.token.functions.allowance(sender_address, spender_address).call(),
+            )
+        except Exception as e:
+            log.error(f"Stake pre-check for {sender_address} failed: {e}")
+            return False
+
+        amount_nulink = amount / 10**18
+        log.info(f"{sender_address} staking amount: {amount_nulink}")
+        if amount_nulink <= 1:
+            log.info(f"Amount Nulink token is: {amount_nulink} NLK. Not need stake")
+            return True
+
+        if allowance_amount < amount:
+            approve_tx = await self.build_transaction(
+                self.token.functions.approve(spender_address, APPROVE_AMOUNT),
+                sender_address,
+            )
+            if not await self.send_transaction(approve_tx, private_key, sender_address):
+                return False
+
+        stake_tx = await self.build_transaction(
+            self.stake_contract.functions.stake(
+                sender_address, sender_address, sender_address, amount
+            ),
+            sender_address,
+        )
+        return await self.send_transaction(stake_tx, private_key, sender_address)
 
 
-def send_nulink_to_dead_wallets(nulink_manager, amount=None):
+def run_async(job, concurrency):
+    async def runner():
+        async with AsyncEngine(web3.provider.endpoint_uri, concurrency) as engine:
+            return await job(engine)
+
+    return asyncio.run(runner())
+
+
+def get_token_balance_wallets_async(nulink_manager, concurrency):
+    wallet_data = nulink_manager.get_all_wallet_data_from_file()
+    wallet_addresses = wallet_addresses_from(wallet_data)
+    balances = run_async(
+        lambda engine: engine.gather(
+            engine.token_balance(address) for address in wallet_addresses
+        ),
+        concurrency,
+    )
+
+    wallet_info = []
+    for i, (wallet, sender_address, balance_nulink_wei) in enumerate(
+        zip(wallet_data, wallet_addresses, balances), start=1
+    ):
+        balance_nulink = Web3.from_wei(balance_nulink_wei or 0, "ether")
+        log.info(f"{i}. {sender_address} : {balance_nulink} NLK")
+        wallet_info.append(
+            (int(i), sender_address, float(balance_nulink), wallet["private_key"])
+        )
+    return wallet_info
+
+
+def get_pending_user_reward_wallets_async(file_manager, concurrency):
+    wallet_addresses = wallet_addresses_from(file_manager.get_all_wallet_data_from_file())
+    rewards = run_async(
+        lambda engine: engine.gather(
+            engine.pending_reward(address) for address in wallet_addresses
+        ),
+        concurrency,
+    )
+    for i, (wallet_address, reward) in enumerate(zip(wallet_addresses, rewards), start=1):
+        log.info(f"{i}. Rewards {wallet_address} {reward} Nulink")
+
+
+def stake_wallets_async(file_manager, concurrency):
+    wallet_data = file_manager.get_all_wallet_data_from_file()
+    results = run_async(
+        lambda engine: engine.gather(
+            engine.approve_and_stake(wallet["private_key"]) for wallet in wallet_data
+        ),
+        concurrency,
+    )
+    log.info(f"Stake finished: {sum(1 for ok in results if ok)}/{len(results)} wallets.")
+
+
+def claim_rewards_wallets_async(file_manager, concurrency):
+    wallet_data = file_manager.get_all_wallet_data_from_file()
+    results = run_async(
+        lambda engine: engine.gather(
+            engine.claim_rewards(wallet["private_key"]) for wallet in wallet_data
+        ),
+        concurrency,
+    )
+    log.info(f"Claim finished: {sum(1 for ok in results if ok)}/{len(results)} wallets.")
+
+
+def set_async_concurrency(value=None):
+    global ASYNC_CONCURRENCY
+    if value is None:
+        try:
+            value = int(input("Concurrent wallets for async mode (0 = off): "))
+        except ValueError:
+            log.error("Invalid number. Please enter a valid integer.")
+            return
+    ASYNC_CONCURRENCY = max(0, int(value))
+    if ASYNC_CONCURRENCY:
+        log.info(f"Async mode on, {ASYNC_CONCURRENCY} wallets at a time")
+    else:
+        log.info("Async mode off")
+
+
+def send_nulink_to_dead_wallets(nulink_manager, amount=None, number=None):
     counts_wallets = get_token_balance_wallets(nulink_manager)
-    log.info("Please enter the number of the wallet to send NLK to dead: ")
-    number_dead = int(input())
-    log.info("Please enter the amount of NLK to send (1-10000): ")
-    amount_dead = int(input())
+    if number is None:
+        log.info("Please enter the number of the wallet to send NLK to dead: ")
+        number = int(input())
+    number_dead = number
+    if amount is None:
+        log.info("Please enter the amount of NLK to send (1-10000): ")
+        amount = int(input())
+    amount_dead = amount
     for i, sender_wallet, balance, private_key in counts_wallets:
         if i == number_dead:
             log.info(f"{i}. {sender_wallet}: {balance} NLK")
@@ -601,16 +3604,151 @@ def send_nulink_to_dead_wallets(nulink_manager, amount=None):
                 log.error(f"Something wrong")
 
 
-def furystorm(file_manager, nulink_manager, private_key_main, furytimes):
+def stream_furystorm(file_manager, nulink_manager, private_key_main, fund_amount):
+    new_wallets = file_manager.get_all_wallet_data_from_file()
+    node_wallets = list(nulink_manager.get_all_wallet_data_from_file())
+    if not new_wallets:
+        return
+    # Seeded by the new wallets so a resumed run pairs them the same way.
+    random.Random(new_wallets[0]["address"]).shuffle(node_wallets)
+    chains = [
+        (new_wallet["address"], {"new": new_wallet, "node": node_wallet})
+        for new_wallet, node_wallet in zip(new_wallets, node_wallets)
+    ]
+
+    amount_wei = int(Web3.to_wei(fund_amount, "ether"))
+    token = contracts.token()
+    spender = contracts.address("stake_contract_address")
+    allowance_cache.sync(token.address, spender)
+
+    def approve(chain, sender):
+        address = chain["node"]["address"]
+        balance = chain["balance"] = get_token_balance(token.address, address)
+        if allowance_cache.is_sufficient(token.address, address, spender, balance):
+            return SKIPPED
+        allowance = allowance_cache.get(token.address, address, spender)
+        return approve_token_spending(chain["node"]["private_key"], allowance, balance, sender)
+
+    steps = [
+        (
+            "fund",
+            lambda chain, sender: send_bnb(
+                private_key_main, chain["new"]["address"], amount_wei, pipeline=sender
+            ),
+            1,  # one sender thread keeps the main wallet's nonces in order
+            STREAM_IN_FLIGHT,
+        ),
+        (
+            "faucet",
+            lambda chain, sender: claim_faucet(
+                chain["new"]["address"], chain["new"]["private_key"], sender
+            ),
+            STREAM_IN_FLIGHT,
+            STREAM_IN_FLIGHT,
+        ),
+        (
+            "send_nlk",
+            lambda chain, sender: send_nulink(
+                chain["new"]["private_key"], chain["node"]["address"], None, sender
+            ),
+            STREAM_IN_FLIGHT,
+            STREAM_IN_FLIGHT,
+        ),
+        (
+            "claim",
+            lambda chain, sender: claim_rewards(chain["node"]["private_key"], None, sender),
+            STREAM_IN_FLIGHT,
+            STREAM_IN_FLIGHT,
+        ),
+        ("approve", approve, STREAM_IN_FLIGHT, STREAM_IN_FLIGHT),
+        (
+            "stake",
+            lambda chain, sender: stake(
+                chain["node"]["private_key"], chain.get("balance"), sender
+            ),
+            STREAM_IN_FLIGHT,
+            STREAM_IN_FLIGHT,
+        ),
+    ]
+    journal = RunJournal.for_operation("furystorm_stream", file_manager)
+    journal.resume_in_flight()
+    scheduler = WalletScheduler(steps, journal=journal)
+    node_of = {label: chain["node"]["address"] for label, chain in chains}
+    for label, step, _, status in scheduler.run(chains):
+        if step == "approve" and status == "success":
+            allowance_cache.set(token.address, node_of[label], spender, APPROVE_AMOUNT)
+        elif step == "stake" and status == "reverted":
+            allowance_cache.invalidate(token.address, node_of[label], spender)
+    allowance_cache.sync(token.address, spender)
+    allowance_cache.save()
+    journal.complete()
+
+
+def furystorm(file_manager, nulink_manager, private_key_main, furytimes, fund_amount=0.001):
     count_wallets_create = int((nulink_manager.count_lines_in_file()))
-    for _ in range(furytimes):
-        delete_wallets(file_manager, "y")
-        create_wallets(file_manager, count_wallets_create)
-        send_bnb_to_wallets(file_manager, private_key_main, 0.001)
-        claim_faucet_to_wallets(file_manager)
-        send_nulink_to_wallets(file_manager, nulink_manager)
-        claim_rewards_wallets(nulink_manager)
-        stake_wallets(nulink_manager)
+    # Each finished phase is journaled per iteration, so a resumed run picks
+    # up where it stopped instead of deleting freshly funded wallets.
+    journal = RunJournal(f"{JOURNAL_DIR}/furystorm.jsonl")
+    phases = [
+        ("delete", lambda: delete_wallets(file_manager, "y")),
+        ("create", lambda: create_wallets(file_manager, count_wallets_create)),
+    ]
+    if FURYSTORM_STREAMING:
+        phases.append(
+            (
+                "stream",
+                lambda: stream_furystorm(
+                    file_manager, nulink_manager, private_key_main, fund_amount
+                ),
+            )
+        )
+    else:
+        phases += [
+            ("fund", lambda: send_bnb_to_wallets(file_manager, private_key_main, fund_amount)),
+            ("faucet", lambda: claim_faucet_to_wallets(file_manager)),
+            ("send_nlk", lambda: send_nulink_to_wallets(file_manager, nulink_manager)),
+            ("claim", lambda: claim_rewards_wallets(nulink_manager)),
+            ("stake", lambda: stake_wallets(nulink_manager)),
+        ]
+    for iteration in range(furytimes):
+        for phase, run_phase in phases:
+            if journal.status(str(iteration), phase) == "success":
+                log.info(f"Furystorm {iteration + 1}: {phase} already done")
+                continue
+            run_phase()
+            journal.record(str(iteration), phase, "success")
+    journal.complete()
+
+
+def wallet_history_report(file_manager):
+    start = time.monotonic()
+    indexer = EventIndexer()
+    fetched = indexer.update()
+    wallet_addresses = wallet_addresses_from(file_manager.get_all_wallet_data_from_file())
+    added = indexer.track(wallet_addresses)
+    log.info(
+        f"Indexed {fetched} new transfers up to block {indexer.checkpoint()}, "
+        f"{added} wallets added to the index"
+    )
+    for i, address in enumerate(wallet_addresses, start=1):
+        summary = indexer.summary(address)
+        if summary is None:
+            log.error(f"{i}. {address} : balance snapshot failed, retry later")
+            continue
+        log.info(
+            f"{i}. {address} : {Web3.from_wei(summary['balance'], 'ether')} NLK, "
+            f"staked {Web3.from_wei(summary['staked'], 'ether')}, "
+            f"rewards claimed {Web3.from_wei(summary['claimed'], 'ether')}"
+        )
+    log.info(f"Report finished in {time.monotonic() - start:.2f} s")
+
+
+def load_private_key_main(filename):
+    private_key_main = FileManager(filename).get_all_wallet_data_from_file()
+    if private_key_main:
+        return random.choice(private_key_main)["private_key"]
+    log.error("Please add main wallet private key")
+    return None
 
 
 def display_menu():
@@ -626,11 +3764,22 @@ def display_menu():
     log.info("9. FuryStorm Attacker")
     log.info("\033[31m10. Send to dead wallet NLK\033[0m")
     log.info("\033[31m11. Exit\033[0m")
+    log.info(f"12. Async mode (concurrency: {ASYNC_CONCURRENCY or 'off'})")
+    log.info("13. Wallet history (local event index)")
+    log.info("14. Send NLK from main to Node Wallets (disperse)")
 
 
 def execute_option(choice, options):
     if choice in options:
+        contracts.reset_stats()
+        gas_limits.reset_stats()
+        metrics.reset_stats()
+        allowance_cache.reset_stats()
         options[choice]()
+        contracts.log_stats()
+        gas_limits.log_stats()
+        allowance_cache.log_stats()
+        metrics.log_stats()
         if choice == "10":
             return False
     else:
@@ -639,6 +3788,26 @@ def execute_option(choice, options):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Nulink wallet manager")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=ASYNC_CONCURRENCY,
+        help="wallets processed concurrently in async mode (0 = off)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        help="serve Prometheus metrics on this local port",
+    )
+    args, _ = parser.parse_known_args()
+    if args.concurrency:
+        set_async_concurrency(args.concurrency)
+    metrics.serve(args.metrics_port)
+    if USE_MULTICALL:
+        multicall.is_available()
+
     file_paths = {
         "ethereum_wallet": "config/ethereum_wallet.txt",
         "private_nulink": "config/private_nulink.txt",
@@ -647,14 +3816,7 @@ def main():
     file_manager = FileManager(file_paths["ethereum_wallet"])
     nulink_manager = FileManager(file_paths["private_nulink"])
 
-    private_key_main = FileManager(
-        file_paths["private_main"]
-    ).get_all_wallet_data_from_file()
-
-    if private_key_main:
-        private_key_main = random.choice(private_key_main)["private_key"]
-    else:
-        log.error("Please add main wallet private key")
+    private_key_main = load_private_key_main(file_paths["private_main"])
 
     options = {
         "0": lambda: get_token_balance_wallets(nulink_manager),
@@ -671,6 +3833,9 @@ def main():
         ),
         "10": lambda: send_nulink_to_dead_wallets(nulink_manager, amount=None),
         "11": lambda: exit(log.info("\033[31mExiting...\033[0m")),
+        "12": lambda: set_async_concurrency(None),
+        "13": lambda: wallet_history_report(nulink_manager),
+        "14": lambda: send_nulink_from_main(nulink_manager, private_key_main),
     }
     while True:
         print()  # Add new line after funct